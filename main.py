@@ -9,6 +9,7 @@ from aiohttp import web
 
 from astrbot.api import AstrBotConfig, logger
 from astrbot.api import all as api
+from astrbot.api.event import AstrMessageEvent, filter
 from astrbot.api.message_components import Plain
 from astrbot.api.star import Context, Star, register
 
@@ -39,6 +40,13 @@ class PluginEntry(Star):
         """处理 webhook 请求"""
         return await self._plugin.handle_webhook(request)
 
+    @filter.command("gh_history")
+    async def gh_history(self, event: AstrMessageEvent):
+        """查询 GitHub 事件历史: /gh_history [repo:owner/name] [author:login] [type:push|issue|pr] [关键词]"""
+        # message_str 包含命令名本身，去掉后剩余部分为查询条件
+        _, _, query = event.message_str.strip().lstrip("/").partition(" ")
+        yield event.plain_result(await self._plugin.query_history(query))
+
     async def terminate(self):
         """插件销毁"""
         await self._plugin.terminate()
@@ -15,7 +15,10 @@ class ConfigNode:
 
     @classmethod
     def _schema(cls) -> dict[str, type]:
-        return cls._SCHEMA_CACHE.setdefault(cls, get_type_hints(cls))
+        schema = cls._SCHEMA_CACHE.get(cls)
+        if schema is None:
+            schema = cls._SCHEMA_CACHE[cls] = get_type_hints(cls)
+        return schema
 
     def __init__(self, data: MutableMapping[str, Any]):
         object.__setattr__(self, "_data", data)
@@ -45,10 +48,19 @@ class PluginConfig(ConfigNode):
     target_umo: str
     webhook_secret: str
     rate_limit: int
+    send_rate_limit: int
+    delivery_order_key: str
+    ci_flush_timeout: int
+    enable_history: bool
+    history_retention_days: int
     enable_agent: bool
     llm_provider_id: str
     agent_timeout: int
     agent_system_prompt: str
+    agent_token_budget: int
+    enable_enrichment: bool
+    github_token: str
+    enrichment_timeout_ms: int
 
     def __init__(self, cfg: AstrBotConfig):
         super().__init__(cfg)
@@ -63,6 +75,11 @@ class PluginConfig(ConfigNode):
             f"  agent_system_prompt: {len(self.agent_system_prompt) if self.agent_system_prompt else 0} chars"
         )
         logger.info(f"  rate_limit: {self.rate_limit} req/min")
+        logger.info(f"  send_rate_limit: {self.send_rate_limit} msg/min")
+        logger.info(f"  delivery_order_key: {self.delivery_order_key}")
+        logger.info(f"  ci_flush_timeout: {self.ci_flush_timeout}s")
+        logger.info(f"  enable_history: {self.enable_history}")
+        logger.info(f"  enable_enrichment: {self.enable_enrichment}")
         logger.info("=" * 60)
 
         if not self.target_umo:
@@ -95,5 +112,22 @@ class PluginConfig(ConfigNode):
                 logger.info("GitHub Webhook: Using default LLM provider")
             if self.agent_system_prompt:
                 logger.info("GitHub Webhook: Custom system prompt configured")
+            if self.agent_token_budget:
+                logger.info(
+                    f"GitHub Webhook: Prompt token budget: {self.agent_token_budget}"
+                )
         else:
             logger.info("GitHub Webhook: LLM mode disabled, using default templates")
+
+        # GitHub API 补充信息配置日志
+        if self.enable_enrichment:
+            logger.info(
+                f"GitHub Webhook: Enrichment enabled "
+                f"(budget: {self.enrichment_timeout_ms}ms, "
+                f"token: {'configured' if self.github_token else 'none'})"
+            )
+            if not self.github_token:
+                logger.warning(
+                    "GitHub Webhook: No github_token configured, "
+                    "GitHub API is limited to 60 requests/hour"
+                )
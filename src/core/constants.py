@@ -9,11 +9,69 @@ DEFAULT_RATE_LIMIT = 10
 # Default LLM timeout (seconds)
 DEFAULT_LLM_TIMEOUT = 60
 
+# Default LLM prompt token budget (0 for unlimited)
+DEFAULT_AGENT_TOKEN_BUDGET = 1024
+
+# Default enrichment budget (milliseconds)
+DEFAULT_ENRICHMENT_TIMEOUT_MS = 1500
+
+# Maximum number of cached GitHub API responses (ETag cache)
+ENRICHMENT_CACHE_SIZE = 256
+
+# GitHub REST API base URL
+GITHUB_API_BASE = "https://api.github.com"
+
+# Delivery ordering keys: events with the same key are delivered in order
+DELIVERY_ORDER_REPO = "repo"
+DELIVERY_ORDER_PR = "pr"
+
+# Default outbound messages per minute per target (0 for unlimited)
+DEFAULT_SEND_RATE_LIMIT = 20
+
+# Messages a target can receive back-to-back before pacing starts
+SEND_BURST = 3
+
+# Maximum low-priority messages merged into one when a target falls behind
+LOW_PRIORITY_MERGE_LIMIT = 20
+
+# Plugin name (used for the plugin data directory)
+PLUGIN_NAME = "astrbot_plugin_github_webhook"
+
+# Event history database file name (in the plugin data directory)
+HISTORY_DB_NAME = "events.db"
+
+# Default event history retention (days)
+DEFAULT_HISTORY_RETENTION_DAYS = 90
+
+# Maximum number of stored history events
+HISTORY_MAX_ROWS = 1_000_000
+
+# Number of results returned by the history command
+HISTORY_QUERY_LIMIT = 10
+
 # GitHub event types
 EVENT_TYPE_PUSH = "push"
 EVENT_TYPE_ISSUES = "issues"
 EVENT_TYPE_PULL_REQUEST = "pull_request"
 EVENT_TYPE_PING = "ping"
+EVENT_TYPE_WORKFLOW_RUN = "workflow_run"
+EVENT_TYPE_CHECK_SUITE = "check_suite"
+EVENT_TYPE_RELEASE = "release"
+
+# CI events are reduced into one summary per commit; signed ones bypass rate limiting
+CI_EVENT_TYPES = (EVENT_TYPE_WORKFLOW_RUN, EVENT_TYPE_CHECK_SUITE)
+
+# Default seconds before an incomplete CI commit is flushed
+DEFAULT_CI_FLUSH_TIMEOUT = 1800
+
+# Maximum number of commits tracked by the CI reducer
+CI_MAX_COMMITS = 256
+
+# Seconds to wait after the last CI completion for late workflows
+CI_SETTLE_SECONDS = 30
+
+# Interval of the CI summary flush loop (seconds)
+CI_FLUSH_INTERVAL = 10
 
 # Issue actions
 ACTION_OPENED = "opened"
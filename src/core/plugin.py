@@ -1,19 +1,56 @@
 """GitHub Webhook Plugin core implementation."""
 
+import asyncio
 import json
 from aiohttp import web
 
 from astrbot.api import all as api
 from astrbot.api.message_components import Plain
-from astrbot.api.star import Context, Star
+from astrbot.api.star import Context, Star, StarTools
 from astrbot.api import logger
 
 from .config import PluginConfig
-from .constants import DEFAULT_PORT
+from .constants import (
+    CI_EVENT_TYPES,
+    CI_FLUSH_INTERVAL,
+    CI_MAX_COMMITS,
+    CI_SETTLE_SECONDS,
+    DEFAULT_AGENT_TOKEN_BUDGET,
+    DEFAULT_CI_FLUSH_TIMEOUT,
+    DEFAULT_ENRICHMENT_TIMEOUT_MS,
+    DEFAULT_HISTORY_RETENTION_DAYS,
+    DEFAULT_PORT,
+    DEFAULT_SEND_RATE_LIMIT,
+    DELIVERY_ORDER_PR,
+    EVENT_TYPE_RELEASE,
+    HISTORY_DB_NAME,
+    HISTORY_MAX_ROWS,
+    HISTORY_QUERY_LIMIT,
+    LOW_PRIORITY_MERGE_LIMIT,
+    PLUGIN_NAME,
+    SEND_BURST,
+    ENRICHMENT_CACHE_SIZE,
+)
+from ..formatters.ci_formatter import format_ci_summary_message
+from ..formatters.history_formatter import format_history_results
+from ..handlers.check_suite_handler import handle_check_suite_event
 from ..handlers.issues_handler import handle_issues_event
 from ..handlers.pull_request_handler import handle_pull_request_event
 from ..handlers.push_handler import handle_push_event
+from ..handlers.workflow_run_handler import handle_workflow_run_event
+from ..services.enrichment_service import enrich_message
+from ..services.event_history import EventHistory, parse_history_query
+from ..services.github_api import GitHubApiClient
+from ..services.prompt_builder import TokenStats
+from ..utils.ci_reducer import CIEventReducer
+from ..utils.ordered_dispatcher import KeyedDispatcher
 from ..utils.rate_limiter import RateLimiter
+from ..utils.send_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    OutboundScheduler,
+)
 from ..utils.verify_signature import verify_signature
 
 
@@ -33,13 +70,68 @@ class GitHubWebhookPlugin(Star):
         else:
             self.rate_limiter = None
 
+        if self.cfg.agent_token_budget is None:
+            self.token_budget = DEFAULT_AGENT_TOKEN_BUDGET
+        else:
+            self.token_budget = self.cfg.agent_token_budget
+        self.token_stats = TokenStats()
+        self.dispatcher = KeyedDispatcher()
+
+        self.ci_reducer = CIEventReducer(
+            max_commits=CI_MAX_COMMITS,
+            flush_timeout=self.cfg.ci_flush_timeout or DEFAULT_CI_FLUSH_TIMEOUT,
+            settle_seconds=CI_SETTLE_SECONDS,
+        )
+        self._ci_flush_task = None
+
+        if self.cfg.send_rate_limit is None:
+            send_rate_limit = DEFAULT_SEND_RATE_LIMIT
+        else:
+            send_rate_limit = self.cfg.send_rate_limit
+        if send_rate_limit > 0:
+            self.send_scheduler = OutboundScheduler(
+                self._send_now,
+                rate_per_minute=send_rate_limit,
+                burst=SEND_BURST,
+                merge_limit=LOW_PRIORITY_MERGE_LIMIT,
+            )
+        else:
+            self.send_scheduler = None
+
+        if self.cfg.enable_history:
+            if self.cfg.history_retention_days is None:
+                retention_days = DEFAULT_HISTORY_RETENTION_DAYS
+            else:
+                retention_days = self.cfg.history_retention_days
+            self.event_history = EventHistory(
+                StarTools.get_data_dir(PLUGIN_NAME) / HISTORY_DB_NAME,
+                retention_days=retention_days,
+                max_rows=HISTORY_MAX_ROWS,
+            )
+        else:
+            self.event_history = None
+
+        self.enrichment_budget = (
+            self.cfg.enrichment_timeout_ms or DEFAULT_ENRICHMENT_TIMEOUT_MS
+        ) / 1000
+        if self.cfg.enable_enrichment:
+            self.github_api = GitHubApiClient(
+                token=self.cfg.github_token or "",
+                cache_size=ENRICHMENT_CACHE_SIZE,
+                call_timeout=self.enrichment_budget,
+            )
+        else:
+            self.github_api = None
+
     async def start_server(self):
         # Clean up any existing server instance
         if self.site:
             await self.site.stop()
+            self.site = None
             logger.info("GitHub Webhook: Cleaned up existing server instance")
         if self.runner:
             await self.runner.cleanup()
+            self.runner = None
             logger.info("GitHub Webhook: Cleaned up existing runner")
 
         self.runner = web.AppRunner(self.app)
@@ -48,12 +140,19 @@ class GitHubWebhookPlugin(Star):
         await self.site.start()
         logger.info(f"GitHub Webhook: Server started on port {self.cfg.port}")
 
+        if self._ci_flush_task is None or self._ci_flush_task.done():
+            self._ci_flush_task = asyncio.ensure_future(self._ci_flush_loop())
+
     async def handle_webhook(self, request: web.Request):
         event_type = request.headers.get("X-GitHub-Event", "unknown")
         signature = request.headers.get("X-Hub-Signature-256", "")
 
-        # Rate limiting check
-        if self.rate_limiter:
+        # Rate limiting check. 已签名的 CI 事件只更新 reducer、不逐条发送，
+        # 不受限流；未签名的 CI 事件可能是伪造的，仍然限流
+        signed_ci = (
+            event_type in CI_EVENT_TYPES and self.cfg.webhook_secret and signature
+        )
+        if self.rate_limiter and not signed_ci:
             is_allowed, retry_after = await self.rate_limiter.is_allowed()
             if not is_allowed:
                 current, max_req = self.rate_limiter.get_usage()
@@ -103,50 +202,188 @@ class GitHubWebhookPlugin(Star):
                 message = await handle_issues_event(data, self.context)
             elif event_type == "pull_request":
                 message = await handle_pull_request_event(data, self.context)
+            elif event_type == "workflow_run":
+                message = await handle_workflow_run_event(data, self.ci_reducer)
+            elif event_type == "check_suite":
+                message = await handle_check_suite_event(data, self.ci_reducer)
             else:
                 logger.info(f"GitHub Webhook: Event type '{event_type}' not handled")
         except Exception as e:
             logger.error(f"GitHub Webhook: Error processing event: {e}", exc_info=True)
             return web.Response(status=500, text="Internal server error")
 
-        if message:
-            if self.cfg.enable_agent:
-                from ..services.llm_service import send_with_agent
+        if message and self.event_history:
+            self.event_history.record(data, event_type)
 
-                await send_with_agent(self, message, data, event_type)
-            else:
-                await self.send_message(message)
+        if message:
+            if self.github_api:
+                # 补充信息与其他事件并发获取，投递顺序仍按事件到达顺序
+                message = asyncio.ensure_future(
+                    enrich_message(
+                        self.github_api,
+                        message,
+                        data,
+                        event_type,
+                        self.enrichment_budget,
+                    )
+                )
+            # 入队后立即响应，不等待同一仓库之前积压的投递完成
+            # （GitHub 的投递超时为 10 秒）
+            self.dispatcher.enqueue(
+                self._delivery_key(data, event_type),
+                self.deliver_message,
+                message,
+                data,
+                event_type,
+            )
 
         return web.Response(status=200, text="OK")
 
-    async def send_message(self, message: str):
+    def _delivery_key(self, data: dict, event_type: str) -> str:
+        """同一 key 的事件按到达顺序投递，不同 key 之间并行"""
+        key = data.get("repository", {}).get("full_name", "")
+        if self.cfg.delivery_order_key == DELIVERY_ORDER_PR:
+            number = (data.get("issue") or data.get("pull_request") or {}).get(
+                "number"
+            )
+            if number:
+                key = f"{key}#{number}"
+        return key
+
+    async def _ci_flush_loop(self):
+        """定期发送已完成或超时的 CI 汇总"""
+        while True:
+            await asyncio.sleep(CI_FLUSH_INTERVAL)
+            try:
+                await self.flush_ci_summaries()
+            except Exception as e:
+                logger.error(f"GitHub Webhook: Error flushing CI summaries: {e}")
+
+    async def flush_ci_summaries(self):
+        """发送 reducer 中已就绪的 CI 汇总消息"""
+        for summary in self.ci_reducer.collect():
+            message = format_ci_summary_message(
+                repo_name=summary["repo_name"],
+                branch=summary["branch"],
+                commit_id=summary["head_sha"][:7],
+                passed=summary["passed"],
+                failed=summary["failed"],
+                pending=summary["pending"],
+                total=summary["total"],
+                commit_url=summary["commit_url"],
+            )
+            data = {
+                "repository": {"full_name": summary["repo_name"]},
+                "ci_summary": summary,
+            }
+            self.dispatcher.enqueue(
+                self._delivery_key(data, "ci"),
+                self.deliver_message,
+                message,
+                data,
+                "ci",
+            )
+
+    async def deliver_message(self, message, data: dict, event_type: str):
+        """投递消息，message 可以是尚未完成的补充信息任务"""
+        if isinstance(message, asyncio.Future):
+            message = await message
+
+        priority = self._message_priority(data, event_type)
+        # 发送排队时同一 key 的消息不会被高优先级消息越过
+        key = self._delivery_key(data, event_type)
+        if self.cfg.enable_agent:
+            from ..services.llm_service import send_with_agent
+
+            await send_with_agent(self, message, data, event_type, priority, key)
+        else:
+            await self.send_message(message, priority, key)
+
+    def _message_priority(self, data: dict, event_type: str) -> int:
+        """CI 失败、安全相关 Issue/PR 和 Release 优先发送，push 最低"""
+        if event_type == "ci":
+            failed = data.get("ci_summary", {}).get("failed")
+            return PRIORITY_HIGH if failed else PRIORITY_NORMAL
+        if event_type == EVENT_TYPE_RELEASE:
+            return PRIORITY_HIGH
+        if event_type in ("issues", "pull_request"):
+            item = data.get("issue") or data.get("pull_request") or {}
+            labels = [label.get("name", "").lower() for label in item.get("labels", [])]
+            if any("security" in label for label in labels):
+                return PRIORITY_HIGH
+            return PRIORITY_NORMAL
+        if event_type == "push":
+            return PRIORITY_LOW
+        return PRIORITY_NORMAL
+
+    async def send_message(
+        self, message: str, priority: int = PRIORITY_NORMAL, key: str | None = None
+    ):
         if not self.cfg.target_umo:
             logger.error(
                 "GitHub Webhook: Cannot send message - target_umo not configured"
             )
             return
 
+        if self.send_scheduler:
+            await self.send_scheduler.enqueue(
+                self.cfg.target_umo, message, priority, key
+            )
+        else:
+            await self._send_now(self.cfg.target_umo, message)
+
+    async def _send_now(self, target_umo: str, message: str):
         try:
             message_chain = api.MessageChain([Plain(message)])
-            result = await self.context.send_message(self.cfg.target_umo, message_chain)
+            result = await self.context.send_message(target_umo, message_chain)
             logger.info(
-                f"GitHub Webhook: Message sent to {self.cfg.target_umo}, result: {result}"
+                f"GitHub Webhook: Message sent to {target_umo}, result: {result}"
             )
             if not result:
-                logger.warning(
-                    f"GitHub Webhook: Platform not found for {self.cfg.target_umo}"
-                )
+                logger.warning(f"GitHub Webhook: Platform not found for {target_umo}")
         except Exception as e:
             # 记录完整错误信息但不传播异常
             logger.error(f"GitHub Webhook: Failed to send message: {e}")
             logger.error(f"GitHub Webhook: Error type: {type(e).__name__}")
             logger.error(f"GitHub Webhook: Error details: {str(e)}")
 
+    async def query_history(self, query_text: str) -> str:
+        """按仓库、作者、类型和关键词查询事件历史"""
+        if not self.event_history:
+            return "事件历史未启用，请在插件配置中开启 enable_history"
+
+        try:
+            events = await self.event_history.query(
+                **parse_history_query(query_text), limit=HISTORY_QUERY_LIMIT
+            )
+        except Exception as e:
+            logger.error(f"GitHub Webhook: Failed to query event history: {e}")
+            return "查询事件历史失败，请查看日志"
+        return format_history_results(events)
+
     async def terminate(self):
         logger.info("GitHub Webhook: Shutting down server...")
+        if self._ci_flush_task:
+            self._ci_flush_task.cancel()
+            try:
+                await self._ci_flush_task
+            except asyncio.CancelledError:
+                pass
+            self._ci_flush_task = None
         if self.site:
             await self.site.stop()
+            self.site = None
             logger.info("GitHub Webhook: Server stopped")
         if self.runner:
             await self.runner.cleanup()
+            self.runner = None
             logger.info("GitHub Webhook: Runner cleaned up")
+        await self.dispatcher.close()
+        if self.send_scheduler:
+            await self.send_scheduler.close()
+        if self.github_api:
+            await self.github_api.close()
+            logger.info("GitHub Webhook: GitHub API session closed")
+        if self.event_history:
+            await self.event_history.close()
+            logger.info("GitHub Webhook: Event history closed")
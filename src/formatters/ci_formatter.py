@@ -0,0 +1,40 @@
+"""CI summary formatter."""
+
+
+def format_ci_summary_message(
+    repo_name: str,
+    branch: str,
+    commit_id: str,
+    passed: list[str],
+    failed: list[str],
+    pending: list[str],
+    total: int,
+    commit_url: str,
+) -> str:
+    """Format aggregated CI result message."""
+    if failed:
+        status_emoji = "❌"
+    elif pending:
+        status_emoji = "⏳"
+    else:
+        status_emoji = "✅"
+
+    summary = f"{len(passed)}/{total} workflows passed"
+    if failed:
+        summary += f", {len(failed)} failed"
+    if pending:
+        summary += f", {len(pending)} not completed"
+
+    lines = [
+        f"{status_emoji} GitHub CI Result",
+        f"📦 {repo_name}",
+        f"🌿 Branch: {branch}",
+        f"🔗 Commit: {commit_id}",
+        f"📊 {summary}",
+    ]
+    if failed:
+        lines.append(f"💥 Failed: {', '.join(failed)}")
+    if pending:
+        lines.append(f"⌛ Not completed: {', '.join(pending)}")
+    lines.append(f"📎 {commit_url}")
+    return "\n".join(lines)
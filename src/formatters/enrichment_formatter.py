@@ -0,0 +1,35 @@
+"""Enrichment details formatter."""
+
+
+def format_enrichment_lines(details: dict) -> str:
+    """Format enrichment details as extra message lines."""
+    lines = []
+
+    if "changed_files" in details:
+        changed_files = str(details["changed_files"])
+        if details.get("changed_files_capped"):
+            changed_files += "+"
+        lines.append(
+            f"📊 {changed_files} files changed, "
+            f"+{details.get('additions', 0)} -{details.get('deletions', 0)}"
+        )
+
+    if details.get("checks_total"):
+        if details.get("checks_failed"):
+            status_emoji = "❌"
+        elif details.get("checks_pending"):
+            status_emoji = "⏳"
+        else:
+            status_emoji = "✅"
+        line = (
+            f"{status_emoji} Checks: {details.get('checks_passed', 0)}"
+            f"/{details['checks_total']} passed"
+        )
+        if details.get("checks_pending"):
+            line += f", {details['checks_pending']} pending"
+        lines.append(line)
+
+    if details.get("labels"):
+        lines.append(f"🏷️ Labels: {', '.join(details['labels'])}")
+
+    return "\n".join(lines)
@@ -0,0 +1,26 @@
+"""Event history query result formatter."""
+
+import time
+
+
+def format_history_results(events: list[dict]) -> str:
+    """Format event history query results."""
+    if not events:
+        return "🔍 没有找到匹配的事件"
+
+    lines = [f"🔍 找到 {len(events)} 条事件（最新在前）"]
+    for event in events:
+        created = time.strftime("%Y-%m-%d %H:%M", time.localtime(event["created_at"]))
+        title = (event.get("title") or "").split("\n", 1)[0]
+        if event["event_type"] == "push":
+            ident = f"{event.get('ref')}@{event.get('sha')}"
+        elif event["event_type"] == "pull_request":
+            ident = f"PR #{event.get('number')} {event.get('action')}"
+        else:
+            ident = f"Issue #{event.get('number')} {event.get('action')}"
+        lines.append(
+            f"\n📅 {created} | {event.get('repo')} | 👤 {event.get('author')}\n"
+            f"📋 {ident}: {title}\n"
+            f"📎 {event.get('url')}"
+        )
+    return "\n".join(lines)
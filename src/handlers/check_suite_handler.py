@@ -0,0 +1,53 @@
+"""Check suite event handler."""
+
+from astrbot.api import logger
+
+# GitHub Actions 的 check suite 与 workflow_run 重复，只处理其他 CI 应用
+GITHUB_ACTIONS_APP_SLUG = "github-actions"
+
+
+async def handle_check_suite_event(data: dict, reducer):
+    """Handle check_suite event from GitHub webhook.
+
+    与 workflow_run 相同，只更新 reducer 中的运行状态。
+    """
+    try:
+        check_suite = data.get("check_suite", {})
+        repository = data.get("repository", {})
+
+        app = check_suite.get("app") or {}
+        if app.get("slug") == GITHUB_ACTIONS_APP_SLUG:
+            return None
+
+        repo_name = repository.get("full_name", "Unknown")
+        head_sha = check_suite.get("head_sha", "")
+        if not head_sha:
+            logger.warning("GitHub Webhook: check_suite event has no head_sha")
+            return None
+
+        workflow = app.get("name", "Unknown")
+        # check suite 没有 run_attempt：重新请求时使用新的 attempt，
+        # 之后的投递沿用最新 attempt，结果相同的 re-run 也会重新汇总
+        status = check_suite.get("status", "")
+        conclusion = check_suite.get("conclusion")
+        attempt = None
+        if data.get("action") == "rerequested":
+            attempt = reducer.current_attempt(repo_name, head_sha, workflow) + 1
+            # payload 中可能仍是上一轮的结果
+            status, conclusion = "requested", None
+
+        reducer.update(
+            repo_name=repo_name,
+            head_sha=head_sha,
+            workflow=workflow,
+            status=status,
+            conclusion=conclusion,
+            attempt=attempt,
+            branch=check_suite.get("head_branch") or "",
+            commit_url=f"{repository.get('html_url', '')}/commit/{head_sha}",
+        )
+        return None
+
+    except Exception as e:
+        logger.error(f"GitHub Webhook: Error handling check_suite event: {e}")
+        return None
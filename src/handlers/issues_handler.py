@@ -5,31 +5,26 @@ from astrbot.api import logger
 from ..formatters.issues_formatter import format_issue_message
 
 
+def extract_issue_fields(data: dict) -> dict:
+    """Extract issues event fields."""
+    issue = data.get("issue", {})
+    repository = data.get("repository", {})
+    sender = data.get("sender", {})
+
+    return {
+        "action": data.get("action", "unknown"),
+        "author_name": sender.get("login", "Unknown"),
+        "repo_name": repository.get("full_name", "Unknown"),
+        "issue_number": issue.get("number", 0),
+        "title": issue.get("title", "No title"),
+        "issue_url": issue.get("html_url", ""),
+    }
+
+
 async def handle_issues_event(data: dict, context):
     """Handle issues event from GitHub webhook."""
     try:
-        action = data.get("action", "unknown")
-        issue = data.get("issue", {})
-        repository = data.get("repository", {})
-
-        issue_number = issue.get("number", 0)
-        title = issue.get("title", "No title")
-        body = issue.get("body", "")
-        issue_url = issue.get("html_url", "")
-
-        sender = data.get("sender", {})
-        author_name = sender.get("login", "Unknown")
-
-        repo_name = repository.get("full_name", "Unknown")
-
-        message = format_issue_message(
-            action=action,
-            author_name=author_name,
-            repo_name=repo_name,
-            issue_number=issue_number,
-            title=title,
-            issue_url=issue_url,
-        )
+        message = format_issue_message(**extract_issue_fields(data))
 
         return message
 
@@ -5,35 +5,28 @@ from astrbot.api import logger
 from ..formatters.pull_request_formatter import format_pull_request_message
 
 
+def extract_pull_request_fields(data: dict) -> dict:
+    """Extract pull request event fields."""
+    pull_request = data.get("pull_request", {})
+    repository = data.get("repository", {})
+    sender = data.get("sender", {})
+
+    return {
+        "action": data.get("action", "unknown"),
+        "author_name": sender.get("login", "Unknown"),
+        "repo_name": repository.get("full_name", "Unknown"),
+        "pr_number": pull_request.get("number", 0),
+        "title": pull_request.get("title", "No title"),
+        "base_branch": pull_request.get("base", {}).get("ref", "unknown"),
+        "head_branch": pull_request.get("head", {}).get("ref", "unknown"),
+        "pr_url": pull_request.get("html_url", ""),
+    }
+
+
 async def handle_pull_request_event(data: dict, context):
     """Handle pull request event from GitHub webhook."""
     try:
-        action = data.get("action", "unknown")
-        pull_request = data.get("pull_request", {})
-        repository = data.get("repository", {})
-
-        pr_number = pull_request.get("number", 0)
-        title = pull_request.get("title", "No title")
-        pr_url = pull_request.get("html_url", "")
-
-        sender = data.get("sender", {})
-        author_name = sender.get("login", "Unknown")
-
-        repo_name = repository.get("full_name", "Unknown")
-
-        base_branch = pull_request.get("base", {}).get("ref", "unknown")
-        head_branch = pull_request.get("head", {}).get("ref", "unknown")
-
-        message = format_pull_request_message(
-            action=action,
-            author_name=author_name,
-            repo_name=repo_name,
-            pr_number=pr_number,
-            title=title,
-            base_branch=base_branch,
-            head_branch=head_branch,
-            pr_url=pr_url,
-        )
+        message = format_pull_request_message(**extract_pull_request_fields(data))
 
         return message
 
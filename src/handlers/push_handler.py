@@ -5,37 +5,41 @@ from astrbot.api import logger
 from ..formatters.push_formatter import format_push_message
 
 
-async def handle_push_event(data: dict, context):
-    """Handle push event from GitHub webhook."""
-    try:
-        pusher = data.get("pusher", {})
-        author_name = pusher.get("name", "Unknown")
-        author_login = pusher.get("email", "")
+def extract_push_fields(data: dict) -> dict | None:
+    """Extract push event fields, None if the push has no commits."""
+    pusher = data.get("pusher", {})
+    author_name = pusher.get("name", "Unknown")
+
+    repository = data.get("repository", {})
+    repo_name = repository.get("full_name", "Unknown")
+
+    ref = data.get("ref", "")
+    branch = ref.replace("refs/heads/", "") if ref else "Unknown"
 
-        repository = data.get("repository", {})
-        repo_name = repository.get("full_name", "Unknown")
+    commits = data.get("commits", [])
+    if not commits:
+        return None
+
+    commit = commits[0]
+    return {
+        "author_name": author_name,
+        "repo_name": repo_name,
+        "branch": branch,
+        "commit_message": commit.get("message", "No message"),
+        "commit_url": commit.get("url", ""),
+        "commit_id": commit.get("id", "")[:7],
+    }
 
-        ref = data.get("ref", "")
-        branch = ref.replace("refs/heads/", "") if ref else "Unknown"
 
-        commits = data.get("commits", [])
-        if not commits:
+async def handle_push_event(data: dict, context):
+    """Handle push event from GitHub webhook."""
+    try:
+        fields = extract_push_fields(data)
+        if fields is None:
             logger.warning("GitHub Webhook: Push event has no commits")
             return None
 
-        commit = commits[0]
-        commit_message = commit.get("message", "No message")
-        commit_url = commit.get("url", "")
-        commit_id = commit.get("id", "")[:7]
-
-        message = format_push_message(
-            author_name=author_name,
-            repo_name=repo_name,
-            branch=branch,
-            commit_message=commit_message,
-            commit_url=commit_url,
-            commit_id=commit_id,
-        )
+        message = format_push_message(**fields)
 
         return message
 
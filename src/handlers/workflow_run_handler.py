@@ -0,0 +1,38 @@
+"""Workflow run event handler."""
+
+from astrbot.api import logger
+
+
+async def handle_workflow_run_event(data: dict, reducer):
+    """Handle workflow_run event from GitHub webhook.
+
+    CI 事件不直接产生消息，只更新 reducer 中的运行状态，
+    汇总消息由插件定期从 reducer 中取出。
+    """
+    try:
+        workflow_run = data.get("workflow_run", {})
+        repository = data.get("repository", {})
+
+        repo_name = repository.get("full_name", "Unknown")
+        head_sha = workflow_run.get("head_sha", "")
+        if not head_sha:
+            logger.warning("GitHub Webhook: workflow_run event has no head_sha")
+            return None
+
+        reducer.update(
+            repo_name=repo_name,
+            head_sha=head_sha,
+            workflow=workflow_run.get("name") or data.get("workflow", {}).get(
+                "name", "Unknown"
+            ),
+            status=workflow_run.get("status", ""),
+            conclusion=workflow_run.get("conclusion"),
+            attempt=workflow_run.get("run_attempt") or 1,
+            branch=workflow_run.get("head_branch") or "",
+            commit_url=f"{repository.get('html_url', '')}/commit/{head_sha}",
+        )
+        return None
+
+    except Exception as e:
+        logger.error(f"GitHub Webhook: Error handling workflow_run event: {e}")
+        return None
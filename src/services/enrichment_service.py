@@ -0,0 +1,157 @@
+"""Event enrichment service using the GitHub REST API."""
+
+import asyncio
+
+from astrbot.api import logger
+
+from ..formatters.enrichment_formatter import format_enrichment_lines
+from .github_api import GitHubApiClient
+
+# /commits/{sha} 响应中 files 列表的单页上限，达到时实际文件数可能更多
+COMMIT_FILES_LIMIT = 300
+
+
+def _summarize_commit(body: dict) -> dict:
+    """只保留 commit 响应中的统计字段，丢弃 files[].patch 等大字段"""
+    stats = body.get("stats", {})
+    changed_files = len(body.get("files", []))
+    return {
+        "additions": stats.get("additions", 0),
+        "deletions": stats.get("deletions", 0),
+        "changed_files": changed_files,
+        "changed_files_capped": changed_files >= COMMIT_FILES_LIMIT,
+    }
+
+
+def _summarize_pull(body: dict) -> dict:
+    return {
+        "additions": body.get("additions", 0),
+        "deletions": body.get("deletions", 0),
+        "changed_files": body.get("changed_files", 0),
+        "labels": [
+            {"name": label.get("name", "")} for label in body.get("labels", [])
+        ],
+    }
+
+
+def _summarize_checks(body: dict) -> dict:
+    """统计检查结果；total_count 是全部检查数，check_runs 只是其中一页"""
+    runs = body.get("check_runs", [])
+    conclusions = [run.get("conclusion") for run in runs]
+    return {
+        "total": body.get("total_count", len(runs)),
+        "passed": sum(
+            1 for c in conclusions if c in ("success", "neutral", "skipped")
+        ),
+        "failed": sum(
+            1 for c in conclusions if c in ("failure", "timed_out", "cancelled")
+        ),
+        "pending": sum(1 for run in runs if run.get("status") != "completed"),
+    }
+
+
+_EXTRACTORS = {
+    "commit": _summarize_commit,
+    "pull": _summarize_pull,
+    "checks": _summarize_checks,
+}
+
+
+def _build_requests(data: dict, event_type: str) -> dict[str, str]:
+    """根据事件类型决定需要请求的 API 路径"""
+    repo_name = data.get("repository", {}).get("full_name")
+    if not repo_name:
+        return {}
+
+    paths = {}
+    if event_type == "push":
+        # 与 push 消息展示的 commit（commits[0]）保持一致；
+        # push 刚发生时 CI 通常还在排队，不请求检查状态
+        commits = data.get("commits") or []
+        sha = commits[0].get("id") if commits else None
+        if sha:
+            paths["commit"] = f"/repos/{repo_name}/commits/{sha}"
+    elif event_type == "pull_request":
+        pull_request = data.get("pull_request", {})
+        pr_number = pull_request.get("number")
+        if pr_number:
+            paths["pull"] = f"/repos/{repo_name}/pulls/{pr_number}"
+        sha = pull_request.get("head", {}).get("sha")
+        if sha:
+            paths["checks"] = (
+                f"/repos/{repo_name}/commits/{sha}/check-runs?per_page=100"
+            )
+    return paths
+
+
+async def _fetch_within(
+    client: GitHubApiClient, paths: dict[str, str], budget: float
+) -> dict:
+    """并发请求，超出预算的请求直接取消，只返回已完成的结果"""
+    tasks = {
+        asyncio.ensure_future(client.get_json(path, _EXTRACTORS[key])): key
+        for key, path in paths.items()
+    }
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending:
+        task.cancel()
+    if pending:
+        logger.warning(
+            f"GitHub Webhook: Enrichment budget ({budget}s) exceeded, "
+            f"skipped: {', '.join(tasks[t] for t in pending)}"
+        )
+    return {
+        tasks[task]: task.result()
+        for task in done
+        if not task.cancelled() and task.exception() is None
+    }
+
+
+def _extract_details(data: dict, event_type: str, results: dict) -> dict:
+    """从 API 响应和 payload 中提取 diff 统计、文件数、检查状态和标签"""
+    details = {}
+
+    commit = results.get("commit")
+    if commit:
+        details.update(commit)
+
+    pull = results.get("pull")
+    if pull:
+        details["additions"] = pull["additions"]
+        details["deletions"] = pull["deletions"]
+        details["changed_files"] = pull["changed_files"]
+
+    checks = results.get("checks")
+    if checks and checks["total"]:
+        details["checks_total"] = checks["total"]
+        details["checks_passed"] = checks["passed"]
+        details["checks_failed"] = checks["failed"]
+        details["checks_pending"] = checks["pending"]
+
+    # 标签已包含在 payload 中，无需额外请求
+    if event_type == "pull_request":
+        labels = (pull or data.get("pull_request", {})).get("labels", [])
+    elif event_type == "issues":
+        labels = data.get("issue", {}).get("labels", [])
+    else:
+        labels = []
+    if labels:
+        details["labels"] = [label.get("name", "") for label in labels]
+
+    return details
+
+
+async def enrich_message(
+    client: GitHubApiClient, message: str, data: dict, event_type: str, budget: float
+) -> str:
+    """在处理器生成的消息后追加 GitHub API 补充信息，失败或超时则原样返回"""
+    try:
+        paths = _build_requests(data, event_type)
+        results = await _fetch_within(client, paths, budget) if paths else {}
+        details = _extract_details(data, event_type, results)
+        extra = format_enrichment_lines(details)
+        if extra:
+            return f"{message}\n{extra}"
+    except Exception as e:
+        logger.error(f"GitHub Webhook: Error enriching {event_type} event: {e}")
+    return message
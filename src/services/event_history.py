@@ -0,0 +1,388 @@
+"""Searchable event history backed by SQLite."""
+
+import asyncio
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from astrbot.api import logger
+
+from ..handlers.issues_handler import extract_issue_fields
+from ..handlers.pull_request_handler import extract_pull_request_fields
+from ..handlers.push_handler import extract_push_fields
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    created_at INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    action TEXT,
+    repo TEXT COLLATE NOCASE,
+    author TEXT COLLATE NOCASE,
+    number INTEGER,
+    ref TEXT,
+    sha TEXT,
+    title TEXT,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_events_repo ON events (repo);
+CREATE INDEX IF NOT EXISTS idx_events_author ON events (author);
+CREATE INDEX IF NOT EXISTS idx_events_type ON events (event_type);
+CREATE INDEX IF NOT EXISTS idx_events_created_at ON events (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+    title, content='events', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS events_ai AFTER INSERT ON events BEGIN
+    INSERT INTO events_fts (rowid, title) VALUES (new.id, new.title);
+END;
+CREATE TRIGGER IF NOT EXISTS events_ad AFTER DELETE ON events BEGIN
+    INSERT INTO events_fts (events_fts, rowid, title)
+    VALUES ('delete', old.id, old.title);
+END;
+"""
+
+# 数据库结构版本（PRAGMA user_version）
+# 1: 全文索引改用 trigram 分词，支持中文子串搜索（需要 SQLite 3.34+）
+_SCHEMA_VERSION = 1
+
+# trigram 分词无法匹配少于 3 个字符的词，这类词改用 LIKE 查询
+_TRIGRAM_MIN_CHARS = 3
+
+_COLUMNS = (
+    "created_at",
+    "event_type",
+    "action",
+    "repo",
+    "author",
+    "number",
+    "ref",
+    "sha",
+    "title",
+    "url",
+)
+
+
+def build_event_records(data: dict, event_type: str) -> list[dict]:
+    """将处理器提取的字段转换为历史记录（push 每个 commit 一条），不支持的事件返回空列表"""
+    if event_type == "push":
+        fields = extract_push_fields(data)
+        if fields is None:
+            return []
+        records = [
+            {
+                "repo": fields["repo_name"],
+                "author": fields["author_name"],
+                "ref": fields["branch"],
+                "sha": commit.get("id", "")[:7],
+                "title": commit.get("message", ""),
+                "url": commit.get("url", ""),
+            }
+            for commit in data.get("commits", [])
+        ]
+    elif event_type == "issues":
+        fields = extract_issue_fields(data)
+        records = [
+            {
+                "action": fields["action"],
+                "repo": fields["repo_name"],
+                "author": fields["author_name"],
+                "number": fields["issue_number"],
+                "title": fields["title"],
+                "url": fields["issue_url"],
+            }
+        ]
+    elif event_type == "pull_request":
+        fields = extract_pull_request_fields(data)
+        records = [
+            {
+                "action": fields["action"],
+                "repo": fields["repo_name"],
+                "author": fields["author_name"],
+                "number": fields["pr_number"],
+                "ref": fields["head_branch"],
+                "title": fields["title"],
+                "url": fields["pr_url"],
+            }
+        ]
+    else:
+        return []
+    created_at = int(time.time())
+    for record in records:
+        record["event_type"] = event_type
+        record["created_at"] = created_at
+    return records
+
+
+_TYPE_ALIASES = {
+    "push": "push",
+    "commit": "push",
+    "issue": "issues",
+    "issues": "issues",
+    "pr": "pull_request",
+    "pull_request": "pull_request",
+}
+
+
+def parse_history_query(text: str) -> dict:
+    """
+    Parse a history command query.
+
+    Syntax: ``repo:owner/name author:login type:push|issue|pr <text>``,
+    all parts optional.
+
+    Args:
+        text: Query text without the command name
+
+    Returns:
+        Keyword arguments for EventHistory.query()
+    """
+    query = {"repo": None, "author": None, "event_type": None, "text": None}
+    words = []
+    for token in text.split():
+        key, sep, value = token.partition(":")
+        key = key.lower()
+        if sep and value and key == "repo":
+            query["repo"] = value
+        elif sep and value and key in ("author", "by"):
+            query["author"] = value.lstrip("@")
+        elif sep and value and key == "type":
+            query["event_type"] = _TYPE_ALIASES.get(value.lower(), value.lower())
+        else:
+            words.append(token)
+    if words:
+        query["text"] = " ".join(words)
+    return query
+
+
+def _text_conditions(text: str) -> tuple[str, list[str]]:
+    """将用户输入拆分为安全的 FTS5 子串查询和 LIKE 模式: (fts_query, like_patterns)"""
+    phrases, patterns = [], []
+    for term in text.split():
+        if len(term) >= _TRIGRAM_MIN_CHARS:
+            # trigram 按子串匹配（中英文均可），加引号避免查询语法注入
+            phrases.append('"{}"'.format(term.replace('"', '""')))
+        else:
+            # 少于 3 个字符的词（如“限流”）trigram 无法匹配，改用 LIKE
+            escaped = (
+                term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            )
+            patterns.append(f"%{escaped}%")
+    return " ".join(phrases), patterns
+
+
+class EventHistory:
+    """Event history store.
+
+    record() 只把记录放入内存缓冲区，不阻塞请求；后台任务按批量或定时
+    写入 SQLite（单独的写线程，事务批量插入）。push 的每个 commit 单独一行。
+    标题和 commit message 建有 FTS5 trigram 全文索引（支持中文子串），
+    仓库、作者、事件类型均有索引。按保留天数和最大行数定期清理旧记录，
+    限制磁盘占用。
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        retention_days: int = 90,
+        max_rows: int = 1_000_000,
+        batch_size: int = 200,
+        flush_interval: float = 5,
+        retention_interval: float = 3600,
+    ):
+        """
+        Initialize event history.
+
+        Args:
+            db_path: SQLite database file path
+            retention_days: Delete events older than this many days (0 to keep forever)
+            max_rows: Maximum number of stored events
+            batch_size: Flush as soon as this many events are buffered
+            flush_interval: Maximum seconds an event stays in the buffer
+            retention_interval: Seconds between retention cleanups
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_interval = retention_interval
+        # 写入持续失败时缓冲区有界，丢弃最旧的记录
+        self._buffer: deque[dict] = deque(maxlen=batch_size * 50)
+        self._wakeup: asyncio.Event | None = None
+        self._flush_task: asyncio.Task | None = None
+        self._executor: ThreadPoolExecutor | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._last_retention = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._migrate(conn)
+            conn.row_factory = sqlite3.Row
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _migrate(conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < _SCHEMA_VERSION:
+            # 旧版本的全文索引使用 unicode61 分词，按新分词器重建
+            conn.execute("DROP TABLE IF EXISTS events_fts")
+        conn.executescript(_SCHEMA)
+        if version < _SCHEMA_VERSION:
+            conn.execute("INSERT INTO events_fts (events_fts) VALUES ('rebuild')")
+            conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.commit()
+
+    async def _run(self, func, *args):
+        """在单独的数据库线程中执行，所有 SQLite 操作串行化"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="github-webhook-history"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def record(self, data: dict, event_type: str):
+        """Buffer an event for insertion (non-blocking)."""
+        records = build_event_records(data, event_type)
+        if not records:
+            return
+        self._buffer.extend(records)
+
+        if self._flush_task is None or self._flush_task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_task = asyncio.ensure_future(self._flush_loop())
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+                if time.monotonic() - self._last_retention >= self.retention_interval:
+                    self._last_retention = time.monotonic()
+                    await self._run(self._apply_retention)
+            except Exception as e:
+                logger.error(f"GitHub Webhook: Failed to write event history: {e}")
+
+    async def flush(self):
+        """Write all buffered events."""
+        if not self._buffer:
+            return
+        batch = list(self._buffer)
+        self._buffer.clear()
+        try:
+            await self._run(self._insert, batch)
+        except Exception:
+            # 放回缓冲区等待下次重试
+            self._buffer.extendleft(reversed(batch))
+            raise
+
+    def _insert(self, batch: list[dict]):
+        conn = self._connect()
+        placeholders = ", ".join(f":{column}" for column in _COLUMNS)
+        rows = [{column: r.get(column) for column in _COLUMNS} for r in batch]
+        with conn:
+            conn.executemany(
+                f"INSERT INTO events ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+
+    def _apply_retention(self):
+        conn = self._connect()
+        with conn:
+            if self.retention_days > 0:
+                cutoff = int(time.time()) - self.retention_days * 86400
+                conn.execute("DELETE FROM events WHERE created_at < ?", (cutoff,))
+            if self.max_rows > 0:
+                conn.execute(
+                    "DELETE FROM events WHERE id <= "
+                    "(SELECT id FROM events ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_rows,),
+                )
+
+    async def query(
+        self,
+        repo: str | None = None,
+        author: str | None = None,
+        event_type: str | None = None,
+        text: str | None = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """
+        Query events, newest first.
+
+        Args:
+            repo: Repository full name (case-insensitive)
+            author: Author login (case-insensitive)
+            event_type: push / issues / pull_request
+            text: Full-text search in titles and commit messages
+            limit: Maximum number of results
+
+        Returns:
+            List of event dicts
+        """
+        await self.flush()
+        return await self._run(self._query, repo, author, event_type, text, limit)
+
+    def _query(self, repo, author, event_type, text, limit) -> list[dict]:
+        conn = self._connect()
+        conditions, params = [], []
+        for column, value in (
+            ("e.repo", repo),
+            ("e.author", author),
+            ("e.event_type", event_type),
+        ):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        fts, patterns = _text_conditions(text) if text else ("", [])
+        if fts:
+            # 从全文索引按 rowid 倒序读取，找到 limit 条即停止，无需排序全部匹配
+            sql = "SELECT e.* FROM events_fts f JOIN events e ON e.id = f.rowid"
+            order = "f.rowid"
+            conditions.append("f.events_fts MATCH ?")
+            params.append(fts)
+        else:
+            sql = "SELECT e.* FROM events e"
+            order = "e.id"
+        for pattern in patterns:
+            conditions.append("e.title LIKE ? ESCAPE '\\'")
+            params.append(pattern)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {order} DESC LIMIT ?"
+        params.append(limit)
+        return [dict(row) for row in conn.execute(sql, params)]
+
+    async def close(self):
+        """Flush buffered events and close the database."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"GitHub Webhook: Failed to write event history: {e}")
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
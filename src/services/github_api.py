@@ -0,0 +1,125 @@
+"""GitHub REST API client with pooled connections and ETag cache."""
+
+import asyncio
+from collections import OrderedDict
+
+import aiohttp
+
+from astrbot.api import logger
+
+from ..core.constants import GITHUB_API_BASE
+
+
+class GitHubApiClient:
+    """GitHub REST API client.
+
+    复用同一个连接池化的 ClientSession，避免每个事件都重新进行 TLS 握手；
+    对 GET 响应按 URL 缓存 ETag，后续请求携带 If-None-Match，
+    命中 304 时直接返回缓存内容（304 不消耗 API 配额）。
+    缓存只保存 extract 提取后的字段而不是完整响应体，
+    避免 /commits/{sha} 这类带 patch 的大响应占用内存。
+    """
+
+    def __init__(
+        self,
+        token: str = "",
+        api_base: str = GITHUB_API_BASE,
+        cache_size: int = 256,
+        call_timeout: float = 1.5,
+        pool_size: int = 10,
+    ):
+        """
+        Initialize GitHub API client.
+
+        Args:
+            token: GitHub token (optional, raises rate limit from 60 to 5000 req/h)
+            api_base: REST API base URL
+            cache_size: Maximum number of cached ETag entries (LRU)
+            call_timeout: Deadline for a single API call in seconds
+            pool_size: Maximum number of pooled connections
+        """
+        self.token = token
+        self.api_base = api_base.rstrip("/")
+        self.cache_size = cache_size
+        self.call_timeout = call_timeout
+        self.pool_size = pool_size
+        self._session: aiohttp.ClientSession | None = None
+        self._cache: OrderedDict[tuple[str, object], tuple[str, object]] = (
+            OrderedDict()
+        )
+        self.not_modified = 0  # 304 命中次数
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the shared session inside the running event loop."""
+        if self._session is None or self._session.closed:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "astrbot_plugin_github_webhook",
+            }
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            self._session = aiohttp.ClientSession(
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.call_timeout),
+                connector=aiohttp.TCPConnector(
+                    limit=self.pool_size, ttl_dns_cache=300
+                ),
+            )
+        return self._session
+
+    def _store(self, key: tuple[str, object], etag: str, value: object):
+        self._cache[key] = (etag, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def get_json(self, path: str, extract=None):
+        """
+        GET a REST API resource, using the ETag cache.
+
+        Args:
+            path: API path, e.g. /repos/owner/repo/pulls/1
+            extract: Optional function reducing the decoded body to the fields
+                the caller needs; only its result is cached
+
+        Returns:
+            Decoded JSON body (or extract(body)), or None on error / timeout
+        """
+        url = f"{self.api_base}{path}"
+        # 同一 URL 不同提取函数的结果分别缓存
+        key = (url, extract)
+        cached = self._cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+
+        try:
+            async with self._get_session().get(url, headers=headers) as resp:
+                if resp.status == 304 and cached:
+                    self._cache.move_to_end(key)
+                    self.not_modified += 1
+                    return cached[1]
+                if resp.status != 200:
+                    logger.warning(
+                        f"GitHub Webhook: GitHub API {path} returned {resp.status}"
+                    )
+                    return None
+                body = await resp.json()
+                if extract is not None:
+                    body = extract(body)
+                etag = resp.headers.get("ETag")
+                if etag:
+                    self._store(key, etag, body)
+                return body
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"GitHub Webhook: GitHub API {path} timed out after {self.call_timeout}s"
+            )
+        except aiohttp.ClientError as e:
+            logger.warning(f"GitHub Webhook: GitHub API {path} failed: {e}")
+        return None
+
+    async def close(self):
+        """Close the shared session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,42 +1,40 @@
 """LLM service for message generation."""
 
 import asyncio
-import json
 
 from astrbot.api import logger
 
+from ..utils.send_scheduler import PRIORITY_NORMAL
+from ..utils.token_estimator import estimate_tokens
+from .prompt_builder import build_prompt
 
-async def send_with_agent(plugin_instance, message: str, data: dict, event_type: str):
+
+async def send_with_agent(
+    plugin_instance,
+    message: str,
+    data: dict,
+    event_type: str,
+    priority: int = PRIORITY_NORMAL,
+    key: str | None = None,
+):
     """使用 LLM 生成个性化消息并发送"""
     try:
-        # 构建 LLM 任务的 prompt
-        event_name = {
-            "push": "代码推送",
-            "issues": "问题",
-            "pull_request": "拉取请求",
-        }.get(event_type, event_type)
-
-        # 构建 LLM 输入信息 - 优化结构，确保 GitHub 事件内容优先级最高
-        llm_input = f"""GitHub 事件信息：
-
-{message}
-
-任务：生成一条简洁、有趣的 QQ 群消息通知。
-要求：
-1. 消息要简洁明了
-2. 可以使用 emoji 增加趣味性
-3. 保留关键信息（作者、仓库、标题、URL等）
-4. 如果有链接（commit URL、issue URL、PR URL），必须保留
-5. 使用友好、生动的语气
-
-请直接输出最终的消息内容，不要有多余的解释。
-"""
+        # 构建 LLM 输入信息 - 按 token 预算压缩，确保 GitHub 事件内容优先级最高
+        llm_input, input_tokens = build_prompt(
+            message,
+            plugin_instance.cfg.agent_system_prompt,
+            plugin_instance.token_budget,
+        )
 
         # 诊断日志
         logger.info("=" * 60)
         logger.info(f"GitHub Webhook: LLM Processing for {event_type} event")
         logger.info(f"  Provider: {plugin_instance.cfg.llm_provider_id or '(default)'}")
         logger.info(f"  Input length: {len(llm_input)} chars")
+        logger.info(
+            f"  Input tokens (estimated): {input_tokens}"
+            f" (prompt budget: {plugin_instance.token_budget or 'unlimited'})"
+        )
         logger.info(f"  Input preview (first 300 chars): {llm_input[:300]}...")
         if plugin_instance.cfg.agent_system_prompt:
             logger.info(
@@ -60,7 +58,7 @@ async def send_with_agent(plugin_instance, message: str, data: dict, event_type:
                 logger.warning(
                     f"GitHub Webhook: Failed to get default provider: {e}, falling back to template"
                 )
-                await plugin_instance.send_message(message)
+                await plugin_instance.send_message(message, priority, key)
                 return
 
         # 调用 LLM
@@ -79,7 +77,10 @@ async def send_with_agent(plugin_instance, message: str, data: dict, event_type:
 
             # 诊断日志：输出长度和内容
             output_text = llm_response.completion_text if llm_response else ""
+            output_tokens = estimate_tokens(output_text)
+            plugin_instance.token_stats.record(event_type, input_tokens, output_tokens)
             logger.info(f"  Output length: {len(output_text)} chars")
+            logger.info(f"  Output tokens (estimated): {output_tokens}")
             if output_text:
                 logger.info(
                     f"  Output preview (first 300 chars): {output_text[:300]}..."
@@ -106,26 +107,26 @@ async def send_with_agent(plugin_instance, message: str, data: dict, event_type:
                     logger.info(
                         f"GitHub Webhook: Generated message: {generated_message[:100]}..."
                     )
-                    await plugin_instance.send_message(generated_message)
+                    await plugin_instance.send_message(generated_message, priority, key)
                 else:
                     logger.warning(
                         "GitHub Webhook: LLM returned empty content, falling back to template"
                     )
-                    await plugin_instance.send_message(message)
+                    await plugin_instance.send_message(message, priority, key)
             else:
                 logger.warning(
                     "GitHub Webhook: LLM returned None or empty completion, falling back to template"
                 )
-                await plugin_instance.send_message(message)
+                await plugin_instance.send_message(message, priority, key)
 
         except asyncio.TimeoutError:
             logger.error(
                 f"GitHub Webhook: LLM timeout after {plugin_instance.cfg.agent_timeout} seconds, falling back to template"
             )
-            await plugin_instance.send_message(message)
+            await plugin_instance.send_message(message, priority, key)
 
     except Exception as e:
         # LLM 调用失败，使用模板作为降级方案
         logger.error(f"GitHub Webhook: LLM invocation failed: {e}")
         logger.error("GitHub Webhook: Falling back to default template")
-        await plugin_instance.send_message(message)
+        await plugin_instance.send_message(message, priority, key)
@@ -0,0 +1,229 @@
+"""Token-budgeted prompt builder for LLM message generation."""
+
+import re
+from functools import lru_cache
+
+from astrbot.api import logger
+
+from ..utils.token_estimator import estimate_tokens, truncate_to_tokens
+
+INSTRUCTION_BLOCK = """任务：生成一条简洁、有趣的 QQ 群消息通知。
+要求：
+1. 消息要简洁明了
+2. 可以使用 emoji 增加趣味性
+3. 保留关键信息（作者、仓库、标题、URL等）
+4. 如果有链接（commit URL、issue URL、PR URL），必须保留
+5. 使用友好、生动的语气
+
+请直接输出最终的消息内容，不要有多余的解释。
+"""
+
+# 配置了人设时，语气和风格交给系统提示词，指令只保留内容要求
+PERSONA_INSTRUCTION_BLOCK = """任务：生成一条 QQ 群消息通知。
+要求：
+1. 消息要简洁明了
+2. 保留关键信息（作者、仓库、标题、URL等）
+3. 如果有链接（commit URL、issue URL、PR URL），必须保留
+4. 语气和风格遵循系统提示词中的人设
+
+请直接输出最终的消息内容，不要有多余的解释。
+"""
+
+# 截断后每行至少保留的 token 数
+MIN_LINE_TOKENS = 16
+
+_URL = re.compile(r"https?://\S+")
+_IDENTIFIER = re.compile(r"#\d+|\b[0-9a-f]{7,40}\b")
+
+# push 消息中 commit message 正文位于 💬 标题行和 🔗 Commit 行之间
+_BODY_START = "💬"
+_BODY_END = "🔗 Commit:"
+
+
+@lru_cache(maxsize=32)
+def _instruction_block(system_prompt: str) -> tuple[str, int, int]:
+    """按人设构建并缓存指令块: (指令块, 指令 token 数, 系统提示词 token 数)"""
+    if system_prompt.strip():
+        instruction = PERSONA_INSTRUCTION_BLOCK
+    else:
+        instruction = INSTRUCTION_BLOCK
+    return (
+        instruction,
+        estimate_tokens(instruction),
+        estimate_tokens(system_prompt),
+    )
+
+
+def _body_range(lines: list[str]) -> tuple[int, int]:
+    """commit message 正文的行范围 [start, end)，没有正文时为空范围"""
+    for end in range(len(lines) - 1, 0, -1):
+        if lines[end].startswith(_BODY_END):
+            for start in range(end - 1, -1, -1):
+                if lines[start].startswith(_BODY_START):
+                    return start + 1, end
+            break
+    return 0, 0
+
+
+def _drop_order(lines: list[str], start: int, end: int) -> list[int]:
+    """正文行的省略顺序：先空行，再从末尾往前的正文行；含 URL 的行保留"""
+    blank, text = [], []
+    for i in range(start, end):
+        if not lines[i].strip():
+            blank.append(i)
+        elif not _URL.search(lines[i]):
+            text.append(i)
+    return blank + text[::-1]
+
+
+def _truncate_line(line: str, max_tokens: int) -> str:
+    """截断一行，保留其中的 #编号 和 commit SHA 等标识符"""
+    keep = 0
+    for match in _IDENTIFIER.finditer(line):
+        keep = match.end()
+    head, tail = line[:keep], line[keep:]
+    return head + truncate_to_tokens(tail, max(max_tokens - estimate_tokens(head), 1))
+
+
+def compact_message(message: str, budget: int) -> str:
+    """
+    Compact a formatted event message to fit a token budget.
+
+    The commit message body (lines between the 💬 subject line and the
+    🔗 Commit line) is omitted one line at a time, blank lines first, then
+    from the end, keeping lines with URLs. If that is not enough, the whole
+    remaining body is replaced by the omission marker. Then the longest
+    free-text lines are truncated, keeping identifiers. URL lines and the
+    header line are never touched.
+
+    Args:
+        message: Formatted event message
+        budget: Maximum estimated tokens for the message
+
+    Returns:
+        Compacted message
+    """
+    if estimate_tokens(message) <= budget:
+        return message
+
+    lines = message.split("\n")
+    start, end = _body_range(lines)
+
+    # 1. 逐行省略正文，直到满足预算
+    tokens = [estimate_tokens(line) for line in lines]
+    # 逐行估算之和加上换行，是整体估算的上界
+    total = sum(tokens) + (len(lines) + 2) // 4
+    marker_tokens = estimate_tokens(f"…（省略 {len(lines)} 行）") + 1
+    dropped, omitted = set(), 0
+
+    def drop(i: int):
+        nonlocal total, omitted
+        dropped.add(i)
+        total -= tokens[i]
+        if lines[i].strip():
+            omitted += 1
+
+    def over_budget() -> bool:
+        return total + (marker_tokens if omitted else 0) > budget
+
+    for i in _drop_order(lines, start, end):
+        if not over_budget():
+            break
+        drop(i)
+    if over_budget():
+        # 仍超出预算：剩余正文（包括含 URL 的行）整体替换为省略标记
+        for i in range(start, end):
+            if i not in dropped:
+                drop(i)
+    if dropped:
+        first = min(i for i in dropped if lines[i].strip()) if omitted else None
+        kept = []
+        for i, line in enumerate(lines):
+            if i == first:
+                kept.append(f"…（省略 {omitted} 行）")
+            if i not in dropped:
+                kept.append(line)
+        lines = kept
+
+    # 2. 从最长的行开始截断，URL 行和标题行不截断
+    candidates = sorted(
+        (
+            i
+            for i, line in enumerate(lines)
+            if i > 0 and not _URL.search(line) and not line.startswith("…（省略")
+        ),
+        key=lambda i: estimate_tokens(lines[i]),
+        reverse=True,
+    )
+    for i in candidates:
+        over = estimate_tokens("\n".join(lines)) - budget
+        if over <= 0:
+            break
+        line_tokens = estimate_tokens(lines[i])
+        if line_tokens <= MIN_LINE_TOKENS:
+            continue
+        # 逐行估算存在取整误差，多截 1 个 token
+        lines[i] = _truncate_line(
+            lines[i], max(line_tokens - over - 1, MIN_LINE_TOKENS)
+        )
+
+    compacted = "\n".join(lines)
+    if estimate_tokens(compacted) > budget:
+        logger.warning(
+            f"GitHub Webhook: Prompt still exceeds token budget after compaction "
+            f"({estimate_tokens(compacted)}/{budget} tokens)"
+        )
+    return compacted
+
+
+def build_prompt(message: str, system_prompt: str, budget: int) -> tuple[str, int]:
+    """
+    Build the LLM prompt for an event within a token budget.
+
+    Args:
+        message: Formatted event message
+        system_prompt: Persona system prompt (counted in input tokens, not budgeted)
+        budget: Token budget for the prompt, 0 for unlimited
+
+    Returns:
+        Tuple of (prompt, estimated_input_tokens)
+        - estimated_input_tokens includes the system prompt
+    """
+    instruction, instruction_tokens, system_tokens = _instruction_block(
+        system_prompt or ""
+    )
+    if budget > 0:
+        # "GitHub 事件信息：" 和空行约占 10 个 token
+        message = compact_message(message, max(budget - instruction_tokens - 10, 0))
+
+    prompt = f"""GitHub 事件信息：
+
+{message}
+
+{instruction}"""
+    return prompt, estimate_tokens(prompt) + system_tokens
+
+
+class TokenStats:
+    """Per-event-type LLM token usage counters."""
+
+    def __init__(self):
+        self.events: dict[str, dict[str, int]] = {}
+
+    def record(self, event_type: str, input_tokens: int, output_tokens: int):
+        """Record token usage of one LLM call."""
+        stats = self.events.setdefault(
+            event_type, {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+        )
+        stats["calls"] += 1
+        stats["input_tokens"] += input_tokens
+        stats["output_tokens"] += output_tokens
+
+    def get_usage(self) -> dict[str, dict[str, int]]:
+        """
+        Get token usage per event type.
+
+        Returns:
+            Mapping of event_type to {calls, input_tokens, output_tokens}
+        """
+        return {event_type: dict(stats) for event_type, stats in self.events.items()}
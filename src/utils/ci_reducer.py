@@ -0,0 +1,229 @@
+"""Stateful reducer for CI (workflow_run / check_suite) events."""
+
+import time
+from collections import OrderedDict
+
+from astrbot.api import logger
+
+# 视为通过 / 失败的 conclusion
+PASSED_CONCLUSIONS = {"success", "neutral", "skipped"}
+FAILED_CONCLUSIONS = {
+    "failure",
+    "timed_out",
+    "cancelled",
+    "action_required",
+    "startup_failure",
+    "stale",
+}
+
+
+class CIEventReducer:
+    """Collapse CI run transitions into one summary per commit.
+
+    每个 (repo, head_sha) 对应一条记录，记录内按 workflow 名保存最新状态。
+    中间状态（requested / in_progress）只更新记录不产生消息；
+    当某个 commit 的所有 workflow 都完成并且在 settle 时间内没有新的 workflow
+    加入时，输出一条汇总。超过 flush_timeout 仍未完成的记录也会被输出。
+    表格超过 max_commits 时最早的记录只记日志、不输出，避免伪造的大量
+    commit 刷屏。已输出的 commit 在 flush_timeout 内保留各 workflow 的
+    最终状态，晚到的重复或中间状态不会再产生一条汇总。
+    """
+
+    def __init__(
+        self,
+        max_commits: int = 256,
+        flush_timeout: float = 1800,
+        settle_seconds: float = 30,
+    ):
+        """
+        Initialize CI reducer.
+
+        Args:
+            max_commits: Maximum number of commits tracked at once
+            flush_timeout: Seconds after first event before an incomplete commit is flushed
+            settle_seconds: Seconds to wait after the last completion for late workflows
+        """
+        self.max_commits = max_commits
+        self.flush_timeout = flush_timeout
+        self.settle_seconds = settle_seconds
+        self._commits: OrderedDict[tuple[str, str], dict] = OrderedDict()
+        # 已输出的 commit: (repo, sha) -> (过期时间, {workflow: (attempt, result)})
+        self._flushed: OrderedDict[tuple[str, str], tuple[float, dict]] = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def _is_stale(previous, attempt: int, status: str) -> bool:
+        """旧 attempt 的事件和已完成后的中间状态不推进状态"""
+        if previous is None:
+            return False
+        previous_attempt, previous_result = previous
+        if attempt != previous_attempt:
+            return attempt < previous_attempt
+        if status != "completed":
+            return previous_result is not None
+        return False
+
+    def _remember_flushed(self, commit: dict, now: float):
+        key = (commit["repo_name"], commit["head_sha"])
+        self._flushed[key] = (now + self.flush_timeout, commit["workflows"])
+        self._flushed.move_to_end(key)
+        while self._flushed and (
+            len(self._flushed) > self.max_commits * 4
+            or next(iter(self._flushed.values()))[0] <= now
+        ):
+            self._flushed.popitem(last=False)
+
+    def _is_flushed_stale(self, key, workflow, attempt, status, conclusion, now):
+        """已输出的 commit 只接受推进状态的事件（re-run、新 workflow 或结果变化）"""
+        entry = self._flushed.get(key)
+        if entry is None:
+            return False
+        if entry[0] <= now:
+            del self._flushed[key]
+            return False
+        previous = entry[1].get(workflow)
+        if previous is None:
+            return False
+        if self._is_stale(previous, attempt, status):
+            return True
+        # 同一 attempt 重复投递的完成事件
+        return (
+            attempt == previous[0]
+            and status == "completed"
+            and (conclusion or "unknown") == previous[1]
+        )
+
+    def current_attempt(self, repo_name: str, head_sha: str, workflow: str) -> int:
+        """
+        Get the latest known attempt of a workflow.
+
+        Check suites have no attempt number; a re-run (rerequested) uses
+        current_attempt() + 1 so it is not mistaken for a duplicate delivery.
+
+        Returns:
+            Latest attempt number, 0 if the workflow is unknown
+        """
+        key = (repo_name, head_sha)
+        commit = self._commits.get(key)
+        if commit is not None:
+            workflows = commit["workflows"]
+        else:
+            workflows = self._flushed.get(key, (0, {}))[1]
+        previous = workflows.get(workflow)
+        return previous[0] if previous else 0
+
+    def update(
+        self,
+        repo_name: str,
+        head_sha: str,
+        workflow: str,
+        status: str,
+        conclusion: str | None,
+        attempt: int | None = None,
+        branch: str = "",
+        commit_url: str = "",
+        now: float | None = None,
+    ):
+        """
+        Record a CI run transition.
+
+        Args:
+            repo_name: Repository full name
+            head_sha: Commit SHA the run belongs to
+            workflow: Workflow (or check app) name
+            status: requested / in_progress / completed
+            conclusion: Run conclusion when completed
+            attempt: Run attempt number, re-runs increase it
+                (None: the latest known attempt, or 1)
+            branch: Head branch
+            commit_url: Commit URL for the summary
+            now: Current monotonic time (for tests)
+        """
+        now = time.monotonic() if now is None else now
+        if attempt is None:
+            attempt = max(self.current_attempt(repo_name, head_sha, workflow), 1)
+        key = (repo_name, head_sha)
+        commit = self._commits.get(key)
+        if commit is None:
+            if self._is_flushed_stale(key, workflow, attempt, status, conclusion, now):
+                return
+            commit = self._commits[key] = {
+                "repo_name": repo_name,
+                "head_sha": head_sha,
+                "branch": branch,
+                "commit_url": commit_url,
+                "first_seen": now,
+                "workflows": {},
+            }
+            while len(self._commits) > self.max_commits:
+                _, evicted = self._commits.popitem(last=False)
+                self._remember_flushed(evicted, now)
+                logger.warning(
+                    f"GitHub Webhook: CI table full, dropped summary for "
+                    f"{evicted['repo_name']}@{evicted['head_sha'][:7]}"
+                )
+        else:
+            self._commits.move_to_end(key)
+
+        # webhook 投递可能乱序：忽略旧 attempt 的事件和已完成后的中间状态
+        previous = commit["workflows"].get(workflow)
+        if self._is_stale(previous, attempt, status):
+            return
+
+        commit["last_update"] = now
+        result = (conclusion or "unknown") if status == "completed" else None
+        commit["workflows"][workflow] = (attempt, result)
+
+    def collect(self, now: float | None = None) -> list[dict]:
+        """
+        Pop summaries of commits that are finished or timed out.
+
+        Args:
+            now: Current monotonic time (for tests)
+
+        Returns:
+            List of summary dicts (see _summarize)
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        for key, commit in list(self._commits.items()):
+            workflows = commit["workflows"]
+            finished = all(result is not None for _, result in workflows.values())
+            if finished and now - commit["last_update"] >= self.settle_seconds:
+                ready.append(self._summarize(commit, timed_out=False))
+            elif now - commit["first_seen"] >= self.flush_timeout:
+                ready.append(self._summarize(commit, timed_out=True))
+            else:
+                continue
+            del self._commits[key]
+            self._remember_flushed(commit, now)
+        return ready
+
+    def get_usage(self) -> tuple[int, int]:
+        """
+        Get current table usage.
+
+        Returns:
+            Tuple of (tracked_commits, max_commits)
+        """
+        return len(self._commits), self.max_commits
+
+    @staticmethod
+    def _summarize(commit: dict, timed_out: bool) -> dict:
+        workflows = {name: result for name, (_, result) in commit["workflows"].items()}
+        return {
+            "repo_name": commit["repo_name"],
+            "head_sha": commit["head_sha"],
+            "branch": commit["branch"],
+            "commit_url": commit["commit_url"],
+            "timed_out": timed_out,
+            "passed": sorted(
+                name for name, r in workflows.items() if r in PASSED_CONCLUSIONS
+            ),
+            "failed": sorted(
+                name for name, r in workflows.items() if r in FAILED_CONCLUSIONS
+            ),
+            "pending": sorted(name for name, r in workflows.items() if r is None),
+            "total": len(workflows),
+        }
@@ -0,0 +1,105 @@
+"""Keyed dispatcher for ordered message delivery."""
+
+import asyncio
+
+from astrbot.api import logger
+
+
+class KeyedDispatcher:
+    """Per-key FIFO dispatcher: ordered within a key, parallel across keys."""
+
+    def __init__(self):
+        """
+        Initialize dispatcher.
+
+        Each key has a lane holding the tail task of its job chain and the
+        number of unfinished jobs. A lane is removed as soon as its last job
+        finishes, so the number of lanes is bounded by the number of keys
+        with in-flight work, not by the number of keys ever seen.
+        """
+        self._lanes: dict[str, list] = {}  # key -> [tail_task, pending_count]
+        self._tasks: set[asyncio.Task] = set()
+
+    def enqueue(self, key: str, func, *args) -> asyncio.Task:
+        """
+        Schedule func(*args) after all previously enqueued jobs with the same key.
+
+        The job is enqueued synchronously, so call order defines execution
+        order within a key. Returns immediately; the dispatcher keeps a
+        reference to the task until it finishes.
+
+        Args:
+            key: Ordering key (e.g. repository full name)
+            func: Coroutine function to run
+            *args: Arguments passed to func
+
+        Returns:
+            Task running the job
+        """
+        lane = self._lanes.get(key)
+        previous = lane[0] if lane else None
+        task = asyncio.ensure_future(self._run_after(previous, func, *args))
+        if lane:
+            lane[0] = task
+            lane[1] += 1
+        else:
+            lane = self._lanes[key] = [task, 1]
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._release(key, lane, t))
+        return task
+
+    async def submit(self, key: str, func, *args):
+        """
+        Enqueue func(*args) and wait for its result.
+
+        Cancelling the caller does not cancel the job, keeping later jobs of
+        the lane in order.
+
+        Args:
+            key: Ordering key (e.g. repository full name)
+            func: Coroutine function to run
+            *args: Arguments passed to func
+
+        Returns:
+            Result of func(*args)
+        """
+        return await asyncio.shield(self.enqueue(key, func, *args))
+
+    @staticmethod
+    async def _run_after(previous, func, *args):
+        if previous is not None:
+            # 只等待前一个任务结束，不关心其结果或异常
+            await asyncio.wait([previous])
+        return await func(*args)
+
+    def _release(self, key: str, lane: list, task: asyncio.Task):
+        self._tasks.discard(task)
+        lane[1] -= 1
+        if lane[1] == 0 and self._lanes.get(key) is lane:
+            del self._lanes[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"GitHub Webhook: Delivery job for {key} failed: {task.exception()}"
+            )
+
+    def get_lane_count(self) -> int:
+        """
+        Get number of active lanes.
+
+        Returns:
+            Number of keys with unfinished jobs
+        """
+        return len(self._lanes)
+
+    async def drain(self):
+        """Wait until all enqueued jobs, including ones added meanwhile, finish."""
+        while self._tasks:
+            await asyncio.wait(list(self._tasks))
+
+    async def close(self):
+        """Cancel all unfinished jobs."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
@@ -0,0 +1,212 @@
+"""Outbound message scheduler with per-target pacing and priority classes."""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+
+from astrbot.api import logger
+
+# Priority classes (lower value is sent first)
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+
+class TokenBucket:
+    """Token bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: float | None = None) -> float:
+        """
+        Try to take one token.
+
+        Returns:
+            0 if a token was taken, otherwise seconds until one is available
+        """
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class _Target:
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        # 按优先级的队列，元素为 (序号, 顺序 key, 消息)
+        self.queues = (deque(), deque(), deque())
+        self.worker: asyncio.Task | None = None
+
+    def backlog(self) -> int:
+        return sum(len(queue) for queue in self.queues)
+
+
+class OutboundScheduler:
+    """Per-target outbound scheduler.
+
+    每个目标（UMO）一个令牌桶。有令牌且没有积压时直接发送；
+    否则按优先级排队，由该目标的后台任务按速率发送，高优先级先发。
+    高优先级只能越过其他顺序 key 的消息：同一 key（仓库或 PR）的消息
+    始终按入队顺序发送，不会破坏 KeyedDispatcher 保证的顺序。
+    积压的低优先级消息在发送时合并为一条，而不是丢弃。
+    目标队列清空后后台任务退出，状态只保留令牌桶。
+    """
+
+    def __init__(
+        self,
+        send_func,
+        rate_per_minute: int,
+        burst: int = 3,
+        merge_limit: int = 20,
+    ):
+        """
+        Initialize outbound scheduler.
+
+        Args:
+            send_func: Coroutine function send_func(target, message) doing the actual send
+            rate_per_minute: Sustained messages per minute per target
+            burst: Messages that can be sent back-to-back before pacing starts
+            merge_limit: Maximum low-priority messages merged into one
+        """
+        self.send_func = send_func
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.merge_limit = merge_limit
+        self._targets: dict[str, _Target] = {}
+        self._seq = itertools.count()
+
+    def _target(self, target: str) -> _Target:
+        state = self._targets.get(target)
+        if state is None:
+            state = self._targets[target] = _Target(TokenBucket(self.rate, self.burst))
+        return state
+
+    async def enqueue(
+        self,
+        target: str,
+        message: str,
+        priority: int = PRIORITY_NORMAL,
+        key: str | None = None,
+    ):
+        """
+        Send a message now if the target has budget, otherwise queue it.
+
+        Args:
+            target: Target UMO
+            message: Message text
+            priority: PRIORITY_HIGH / PRIORITY_NORMAL / PRIORITY_LOW
+            key: Ordering key; messages with the same key never overtake
+                each other (None: no ordering constraint)
+        """
+        state = self._target(target)
+        if state.worker is None and state.bucket.try_acquire() == 0:
+            await self.send_func(target, message)
+            return
+
+        seq = next(self._seq)
+        state.queues[priority].append((seq, seq if key is None else key, message))
+        if state.worker is None:
+            state.worker = asyncio.ensure_future(self._drain(target, state))
+        logger.info(
+            f"GitHub Webhook: Message queued for {target} "
+            f"(priority: {priority}, backlog: {state.backlog()})"
+        )
+
+    def _next_message(self, state: _Target) -> str:
+        # 每个 key 只有最早入队的消息可以发送，其中按 (优先级, 入队顺序) 选择
+        entries = sorted(
+            (seq, priority, key)
+            for priority, queue in enumerate(state.queues)
+            for seq, key, _ in queue
+        )
+        if not entries:
+            raise IndexError("empty backlog")
+        heads, seen = [], set()
+        for seq, priority, key in entries:
+            if key not in seen:
+                seen.add(key)
+                heads.append((priority, seq))
+        priority, seq = min(heads)
+
+        queue = state.queues[priority]
+        if priority != PRIORITY_LOW:
+            return self._pop(queue, seq)
+
+        # 所有 key 最早的消息都是低优先级：按入队顺序合并，
+        # 某个 key 前面还有未合并的消息时跳过该 key 之后的消息
+        merged, blocked = [], set()
+        for seq, priority, key in entries:
+            if len(merged) >= self.merge_limit:
+                break
+            if priority == PRIORITY_LOW and key not in blocked:
+                merged.append(self._pop(queue, seq))
+            else:
+                blocked.add(key)
+        if len(merged) == 1:
+            return merged[0]
+        return f"📚 {len(merged)} 条通知合并发送\n\n" + "\n\n".join(merged)
+
+    @staticmethod
+    def _pop(queue: deque, seq: int) -> str:
+        for index, (entry_seq, _, message) in enumerate(queue):
+            if entry_seq == seq:
+                del queue[index]
+                return message
+        raise KeyError(seq)
+
+    async def _drain(self, target: str, state: _Target):
+        try:
+            while state.backlog():
+                wait = state.bucket.try_acquire()
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                try:
+                    await self.send_func(target, self._next_message(state))
+                except Exception as e:
+                    logger.error(f"GitHub Webhook: Paced send to {target} failed: {e}")
+        finally:
+            state.worker = None
+
+    def get_backlog(self, target: str) -> int:
+        """
+        Get number of queued messages for a target.
+
+        Returns:
+            Number of queued messages
+        """
+        state = self._targets.get(target)
+        return state.backlog() if state else 0
+
+    async def close(self):
+        """Cancel all workers, dropping queued messages."""
+        workers = [s.worker for s in self._targets.values() if s.worker]
+        dropped = sum(s.backlog() for s in self._targets.values())
+        for worker in workers:
+            worker.cancel()
+        if workers:
+            await asyncio.wait(workers)
+        # 丢弃积压和目标状态，重新启动后不会再发送已记录为丢弃的消息
+        self._targets.clear()
+        if dropped:
+            logger.warning(
+                f"GitHub Webhook: Dropped {dropped} queued messages on shutdown"
+            )
@@ -0,0 +1,56 @@
+"""Fast local token estimator."""
+
+import re
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of LLM tokens in text without a tokenizer.
+
+    ASCII text averages about 4 characters per token; CJK characters and
+    emoji are counted as one token each.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    if text.isascii():
+        return (len(text) + 3) // 4
+    non_ascii = len(_NON_ASCII.findall(text))
+    return (len(text) - non_ascii + 3) // 4 + non_ascii
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = "…") -> str:
+    """
+    Truncate text so that its estimated token count fits max_tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum estimated tokens, including the suffix
+        suffix: Marker appended when text is truncated
+
+    Returns:
+        Original text if it fits, otherwise the longest fitting prefix plus suffix
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - estimate_tokens(suffix)
+    if budget <= 0:
+        return suffix
+
+    # 二分查找能放进预算的最长前缀
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + suffix
@@ -0,0 +1,165 @@
+"""Tests for CI event reducer."""
+
+import asyncio
+
+from src.formatters.ci_formatter import format_ci_summary_message
+from src.handlers.check_suite_handler import handle_check_suite_event
+from src.utils.ci_reducer import CIEventReducer
+
+REPO = "owner/repo"
+SHA = "abc1234def5678"
+
+
+def run_workflow(reducer, workflow, conclusion, now, attempt=1):
+    """模拟一个 workflow 的 requested → in_progress → completed"""
+    reducer.update(REPO, SHA, workflow, "requested", None, attempt, now=now)
+    reducer.update(REPO, SHA, workflow, "in_progress", None, attempt, now=now)
+    reducer.update(REPO, SHA, workflow, "completed", conclusion, attempt, now=now)
+
+
+def test_intermediate_transitions_suppressed():
+    """测试未完成的 workflow 不产生汇总"""
+    reducer = CIEventReducer(settle_seconds=30)
+    reducer.update(REPO, SHA, "build", "requested", None, now=0)
+    reducer.update(REPO, SHA, "build", "in_progress", None, now=1)
+    assert reducer.collect(now=100) == []
+
+
+def test_single_summary_per_commit():
+    """测试所有 workflow 完成后输出一条汇总"""
+    reducer = CIEventReducer(settle_seconds=30)
+    run_workflow(reducer, "build", "success", now=0)
+    run_workflow(reducer, "lint", "success", now=1)
+    run_workflow(reducer, "test", "success", now=2)
+    run_workflow(reducer, "deploy", "failure", now=3)
+
+    # settle 时间内不输出，等待可能晚到的 workflow
+    assert reducer.collect(now=10) == []
+
+    summaries = reducer.collect(now=40)
+    assert len(summaries) == 1
+    summary = summaries[0]
+    assert summary["total"] == 4
+    assert summary["passed"] == ["build", "lint", "test"]
+    assert summary["failed"] == ["deploy"]
+    assert summary["pending"] == []
+    assert not summary["timed_out"]
+    assert reducer.get_usage()[0] == 0
+
+
+def test_rerun_replaces_previous_attempt():
+    """测试 re-run 覆盖之前的结果"""
+    reducer = CIEventReducer(settle_seconds=30)
+    run_workflow(reducer, "build", "failure", now=0)
+    run_workflow(reducer, "build", "success", now=5, attempt=2)
+    summary = reducer.collect(now=40)[0]
+    assert summary["passed"] == ["build"]
+    assert summary["failed"] == []
+
+
+def test_out_of_order_delivery_ignored():
+    """测试乱序到达的中间状态和旧 attempt 不覆盖已完成结果"""
+    reducer = CIEventReducer(settle_seconds=30)
+    reducer.update(REPO, SHA, "build", "completed", "success", 2, now=0)
+    reducer.update(REPO, SHA, "build", "in_progress", None, 2, now=1)
+    reducer.update(REPO, SHA, "build", "completed", "failure", 1, now=2)
+    summary = reducer.collect(now=40)[0]
+    assert summary["passed"] == ["build"]
+
+
+def test_flush_timeout_for_incomplete_runs():
+    """测试超时仍未完成的 commit 被强制输出"""
+    reducer = CIEventReducer(flush_timeout=600, settle_seconds=30)
+    run_workflow(reducer, "build", "success", now=0)
+    reducer.update(REPO, SHA, "deploy", "in_progress", None, now=1)
+    assert reducer.collect(now=300) == []
+
+    summary = reducer.collect(now=600)[0]
+    assert summary["timed_out"]
+    assert summary["pending"] == ["deploy"]
+
+
+def test_table_is_bounded():
+    """测试超过容量时最早的 commit 被丢弃，不产生消息"""
+    reducer = CIEventReducer(max_commits=2, settle_seconds=30)
+    for i in range(3):
+        reducer.update(REPO, f"sha{i}", "build", "in_progress", None, now=i)
+    assert reducer.get_usage() == (2, 2)
+    assert reducer.collect(now=3) == []
+
+
+def test_late_delivery_after_flush_ignored():
+    """测试汇总输出后晚到的中间状态和重复完成事件不会产生新的汇总"""
+    reducer = CIEventReducer(flush_timeout=1800, settle_seconds=30)
+    reducer.update(REPO, SHA, "build", "completed", "success", now=0)
+    assert len(reducer.collect(now=40)) == 1
+
+    reducer.update(REPO, SHA, "build", "in_progress", None, now=50)
+    reducer.update(REPO, SHA, "build", "completed", "success", now=60)
+    assert reducer.get_usage()[0] == 0
+    assert reducer.collect(now=1900) == []
+
+    # re-run 仍会产生新的汇总
+    run_workflow(reducer, "build", "failure", now=100, attempt=2)
+    summary = reducer.collect(now=200)[0]
+    assert summary["failed"] == ["build"]
+
+
+def check_suite_payload(action: str, status: str, conclusion: str | None) -> dict:
+    return {
+        "action": action,
+        "check_suite": {
+            "head_sha": SHA,
+            "head_branch": "main",
+            "status": status,
+            "conclusion": conclusion,
+            "app": {"slug": "circleci", "name": "CircleCI"},
+        },
+        "repository": {
+            "full_name": REPO,
+            "html_url": f"https://github.com/{REPO}",
+        },
+    }
+
+
+def test_check_suite_rerun_with_same_result_summarized(monkeypatch):
+    """测试第三方 check suite 重新运行后结果相同也会重新汇总"""
+    clock = [0]
+    monkeypatch.setattr("src.utils.ci_reducer.time.monotonic", lambda: clock[0])
+    reducer = CIEventReducer(settle_seconds=30)
+
+    def deliver(action, status, conclusion):
+        payload = check_suite_payload(action, status, conclusion)
+        asyncio.run(handle_check_suite_event(payload, reducer))
+
+    deliver("completed", "completed", "failure")
+    clock[0] = 40
+    assert reducer.collect()[0]["failed"] == ["CircleCI"]
+
+    clock[0] = 100
+    deliver("rerequested", "completed", "failure")
+    deliver("completed", "completed", "failure")
+    # 同一轮重复投递的完成事件仍被忽略
+    deliver("completed", "completed", "failure")
+    clock[0] = 140
+    summaries = reducer.collect()
+    assert len(summaries) == 1
+    assert summaries[0]["failed"] == ["CircleCI"]
+    assert reducer.collect(now=2000) == []
+
+
+def test_format_ci_summary_message():
+    """测试汇总消息格式"""
+    message = format_ci_summary_message(
+        repo_name=REPO,
+        branch="main",
+        commit_id=SHA[:7],
+        passed=["build", "lint", "test"],
+        failed=["deploy"],
+        pending=[],
+        total=4,
+        commit_url=f"https://github.com/{REPO}/commit/{SHA}",
+    )
+    assert message.startswith("❌ GitHub CI Result")
+    assert "3/4 workflows passed, 1 failed" in message
+    assert "Failed: deploy" in message
@@ -0,0 +1,244 @@
+"""Tests for GitHub API enrichment."""
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from src.services.enrichment_service import enrich_message
+from src.services.github_api import GitHubApiClient
+
+SHA = "abc1234def"
+
+
+class GitHubStub:
+    """本地 GitHub REST API 桩服务，支持 ETag / If-None-Match"""
+
+    def __init__(self, delay: float = 0, commit_files: int = 2, check_runs=None):
+        self.delay = delay
+        self.commit_files = commit_files
+        self.runs = check_runs or [
+            ("completed", "success"),
+            ("completed", "success"),
+            ("completed", "failure"),
+        ]
+        self.requests = []
+        self.not_modified = 0
+        self.app = web.Application()
+        self.app.router.add_get("/repos/{owner}/{repo}/pulls/{number}", self.pull)
+        self.app.router.add_get(
+            "/repos/{owner}/{repo}/commits/{sha}/check-runs", self.check_runs
+        )
+        self.app.router.add_get("/repos/{owner}/{repo}/commits/{sha}", self.commit)
+        self.runner = None
+        self.base_url = ""
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{self.runner.addresses[0][1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def _respond(self, request: web.Request, body: dict):
+        self.requests.append(request.path)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        etag = f'"{request.path}"'
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.json_response(body, headers={"ETag": etag})
+
+    async def pull(self, request):
+        return await self._respond(
+            request,
+            {
+                "number": int(request.match_info["number"]),
+                "additions": 10,
+                "deletions": 2,
+                "changed_files": 3,
+                "labels": [{"name": "bug"}],
+            },
+        )
+
+    async def commit(self, request):
+        # 不同 commit 返回不同统计，便于确认请求的是哪个 commit
+        additions = 5 if request.match_info["sha"] == SHA else 50
+        return await self._respond(
+            request,
+            {
+                "stats": {"additions": additions, "deletions": 1},
+                "files": [
+                    {"filename": f"f{i}.py", "patch": "@@ -1 +1 @@\n" * 100}
+                    for i in range(self.commit_files)
+                ],
+            },
+        )
+
+    async def check_runs(self, request):
+        return await self._respond(
+            request,
+            {
+                "total_count": len(self.runs),
+                "check_runs": [
+                    {"status": status, "conclusion": conclusion}
+                    for status, conclusion in self.runs
+                ],
+            },
+        )
+
+
+def pull_request_payload(number: int = 1) -> dict:
+    return {
+        "action": "opened",
+        "pull_request": {"number": number, "head": {"sha": SHA}},
+        "repository": {"full_name": "owner/repo"},
+    }
+
+
+async def _with_stub(
+    test, delay: float = 0, commit_files: int = 2, check_runs=None, **client_kwargs
+):
+    stub = GitHubStub(delay=delay, commit_files=commit_files, check_runs=check_runs)
+    await stub.start()
+    client = GitHubApiClient(api_base=stub.base_url, **client_kwargs)
+    try:
+        await test(stub, client)
+    finally:
+        await client.close()
+        await stub.stop()
+
+
+def test_enrich_pull_request_message():
+    """测试 PR 消息追加 diff 统计、检查状态和标签"""
+
+    async def test(stub, client):
+        message = await enrich_message(
+            client, "PR", pull_request_payload(), "pull_request", budget=2
+        )
+        assert message.startswith("PR\n")
+        assert "3 files changed, +10 -2" in message
+        assert "Checks: 2/3 passed" in message
+        assert "Labels: bug" in message
+
+    asyncio.run(_with_stub(test))
+
+
+def push_payload(*shas: str) -> dict:
+    return {
+        "after": shas[-1],
+        "commits": [{"id": sha} for sha in shas],
+        "repository": {"full_name": "owner/repo"},
+    }
+
+
+def test_enrich_push_message():
+    """测试 push 消息追加 commit 统计，不请求检查状态"""
+
+    async def test(stub, client):
+        message = await enrich_message(
+            client, "Push", push_payload(SHA), "push", budget=2
+        )
+        assert "2 files changed, +5 -1" in message
+        assert "Checks" not in message
+        assert not any("check-runs" in path for path in stub.requests)
+
+    asyncio.run(_with_stub(test))
+
+
+def test_enrich_multi_commit_push_uses_first_commit():
+    """测试多 commit 的 push 统计的是消息中展示的第一个 commit"""
+
+    async def test(stub, client):
+        data = push_payload(SHA, "fedcba98765")
+        message = await enrich_message(client, "Push", data, "push", budget=2)
+        assert "+5 -1" in message
+        assert stub.requests == [f"/repos/owner/repo/commits/{SHA}"]
+
+    asyncio.run(_with_stub(test))
+
+
+def test_pending_checks_not_shown_as_passed():
+    """测试未完成的检查单独计数，不显示为通过"""
+
+    async def test(stub, client):
+        message = await enrich_message(
+            client, "PR", pull_request_payload(), "pull_request", budget=2
+        )
+        assert "⏳ Checks: 1/3 passed, 2 pending" in message
+
+    runs = [("completed", "success"), ("queued", None), ("in_progress", None)]
+    asyncio.run(_with_stub(test, check_runs=runs))
+
+
+def test_commit_file_count_capped():
+    """测试 files 列表达到单页上限时标注为 300+，缓存中不保存 patch"""
+
+    async def test(stub, client):
+        message = await enrich_message(
+            client, "Push", push_payload(SHA), "push", budget=2
+        )
+        assert "300+ files changed" in message
+        for _, value in client._cache.values():
+            assert "patch" not in repr(value)
+
+    asyncio.run(_with_stub(test, commit_files=300))
+
+
+def test_etag_cache_revalidates_with_304():
+    """测试第二次请求携带 If-None-Match 并复用缓存内容"""
+
+    async def test(stub, client):
+        path = "/repos/owner/repo/pulls/1"
+        first = await client.get_json(path)
+        second = await client.get_json(path)
+        assert first == second
+        assert stub.not_modified == 1
+        assert client.not_modified == 1
+
+    asyncio.run(_with_stub(test))
+
+
+def test_etag_cache_lru_eviction():
+    """测试缓存超出容量时淘汰最久未使用的条目"""
+
+    async def test(stub, client):
+        await client.get_json("/repos/owner/repo/pulls/1")
+        await client.get_json("/repos/owner/repo/pulls/2")
+        await client.get_json("/repos/owner/repo/pulls/1")  # 304, 刷新为最近使用
+        await client.get_json("/repos/owner/repo/pulls/3")  # 淘汰 pulls/2
+        await client.get_json("/repos/owner/repo/pulls/2")  # 缓存未命中
+        assert stub.not_modified == 1
+        assert len(client._cache) == 2
+
+    asyncio.run(_with_stub(test, cache_size=2))
+
+
+def test_enrichment_respects_budget():
+    """测试 API 过慢时在预算内返回原消息"""
+
+    async def test(stub, client):
+        started = time.monotonic()
+        message = await enrich_message(
+            client, "PR", pull_request_payload(), "pull_request", budget=0.2
+        )
+        assert time.monotonic() - started < 0.5
+        assert message == "PR"
+
+    asyncio.run(_with_stub(test, delay=1, call_timeout=0.2))
+
+
+def test_enrichment_reuses_pooled_session():
+    """测试多次请求复用同一个 ClientSession"""
+
+    async def test(stub, client):
+        await client.get_json("/repos/owner/repo/pulls/1")
+        session = client._session
+        await client.get_json("/repos/owner/repo/pulls/2")
+        assert client._session is session
+
+    asyncio.run(_with_stub(test))
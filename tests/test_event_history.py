@@ -0,0 +1,223 @@
+"""Tests for event history store."""
+
+import asyncio
+import sqlite3
+import time
+
+from src.formatters.history_formatter import format_history_results
+from src.services.event_history import (
+    _SCHEMA,
+    EventHistory,
+    build_event_records,
+    parse_history_query,
+)
+
+
+def push_payload(i: int, message: str, repo: str = "owner/repo") -> dict:
+    return {
+        "ref": "refs/heads/main",
+        "pusher": {"name": "alice"},
+        "repository": {"full_name": repo},
+        "commits": [
+            {
+                "id": f"{i:07d}abcdef",
+                "message": message,
+                "url": f"https://github.com/{repo}/commit/{i}",
+            }
+        ],
+    }
+
+
+def pr_payload(number: int, title: str, author: str = "bob") -> dict:
+    return {
+        "action": "opened",
+        "pull_request": {
+            "number": number,
+            "title": title,
+            "html_url": f"https://github.com/owner/repo/pull/{number}",
+            "base": {"ref": "main"},
+            "head": {"ref": "feature"},
+        },
+        "repository": {"full_name": "owner/repo"},
+        "sender": {"login": author},
+    }
+
+
+def test_build_event_records():
+    """测试从处理器字段构建历史记录"""
+    [record] = build_event_records(pr_payload(10, "Add cache"), "pull_request")
+    assert record["repo"] == "owner/repo"
+    assert record["author"] == "bob"
+    assert record["number"] == 10
+    assert record["title"] == "Add cache"
+    assert build_event_records({}, "ping") == []
+    assert build_event_records({"commits": []}, "push") == []
+
+
+def test_push_records_every_commit():
+    """测试 push 中的每个 commit 都单独记录"""
+    data = push_payload(1, "first commit")
+    data["commits"].append(
+        {
+            "id": "0000002abcdef",
+            "message": "Fix webhook signature",
+            "url": "https://github.com/owner/repo/commit/2",
+        }
+    )
+    records = build_event_records(data, "push")
+    assert [r["sha"] for r in records] == ["0000001", "0000002"]
+    assert records[1]["url"] == "https://github.com/owner/repo/commit/2"
+
+
+def test_parse_history_query():
+    """测试查询语法解析"""
+    query = parse_history_query("repo:owner/repo author:@bob type:pr rate limiter")
+    assert query == {
+        "repo": "owner/repo",
+        "author": "bob",
+        "event_type": "pull_request",
+        "text": "rate limiter",
+    }
+    assert parse_history_query("")["text"] is None
+
+
+def test_record_and_query(tmp_path):
+    """测试批量写入后按仓库、作者、类型和全文查询"""
+
+    async def run():
+        history = EventHistory(tmp_path / "events.db", batch_size=2)
+        history.record(push_payload(1, "Fix rate limiter overflow"), "push")
+        history.record(push_payload(2, "Update docs", repo="owner/other"), "push")
+        history.record(pr_payload(3, "Add ETag cache for enrichment"), "pull_request")
+        history.record({}, "ping")
+
+        events = await history.query(text="limiter")
+        assert [e["sha"] for e in events] == ["0000001"]
+
+        events = await history.query(text="cach")  # 前缀匹配
+        assert [e["number"] for e in events] == [3]
+
+        events = await history.query(repo="OWNER/REPO")
+        assert len(events) == 2
+
+        events = await history.query(author="bob", event_type="pull_request")
+        assert [e["title"] for e in events] == ["Add ETag cache for enrichment"]
+
+        # 查询语法字符不会导致 FTS5 报错
+        assert await history.query(text='"unbalanced AND (') == []
+        assert await history.query(text="50%") == []
+        await history.close()
+
+    asyncio.run(run())
+
+
+def test_query_later_commits_in_push(tmp_path):
+    """测试 push 中非第一个 commit 的 message 也能被搜索到"""
+
+    async def run():
+        history = EventHistory(tmp_path / "events.db")
+        data = push_payload(1, "first commit")
+        data["commits"].append(
+            {
+                "id": "0000002abcdef",
+                "message": "Fix webhook signature",
+                "url": "https://github.com/owner/repo/commit/2",
+            }
+        )
+        history.record(data, "push")
+
+        events = await history.query(text="signature")
+        assert [e["sha"] for e in events] == ["0000002"]
+        assert len(await history.query(event_type="push")) == 2
+        await history.close()
+
+    asyncio.run(run())
+
+
+def test_query_cjk_text(tmp_path):
+    """测试中文关键词按子串匹配，包括少于 3 个字的词"""
+
+    async def run():
+        history = EventHistory(tmp_path / "events.db")
+        history.record(push_payload(1, "修复限流器溢出问题"), "push")
+        history.record(push_payload(2, "更新文档"), "push")
+
+        for text in ("限流", "限流器", "溢出问题", "限流 溢出"):
+            events = await history.query(text=text)
+            assert [e["sha"] for e in events] == ["0000001"], text
+        assert await history.query(text="限流 文档") == []
+        await history.close()
+
+    asyncio.run(run())
+
+
+def test_migrates_unicode61_index(tmp_path):
+    """测试旧版本 unicode61 全文索引升级为 trigram 并重建"""
+    db_path = tmp_path / "events.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_SCHEMA.replace(", tokenize='trigram'", ""))
+    conn.execute(
+        "INSERT INTO events (created_at, event_type, title) "
+        "VALUES (?, 'push', '修复限流器溢出问题')",
+        (int(time.time()),),
+    )
+    conn.commit()
+    conn.close()
+
+    async def run():
+        history = EventHistory(db_path)
+        events = await history.query(text="溢出")
+        assert [e["title"] for e in events] == ["修复限流器溢出问题"]
+        assert len(await history.query(text="限流器")) == 1
+        await history.close()
+
+    asyncio.run(run())
+
+
+def test_retention(tmp_path):
+    """测试按最大行数和保留天数清理"""
+
+    async def run():
+        history = EventHistory(tmp_path / "events.db", max_rows=3, retention_days=1)
+        for i in range(5):
+            history.record(push_payload(i, f"commit {i}"), "push")
+        await history.flush()
+        await history._run(history._apply_retention)
+
+        events = await history.query(limit=10)
+        assert [e["title"] for e in events] == ["commit 4", "commit 3", "commit 2"]
+        # 已删除的记录也从全文索引中移除
+        assert await history.query(text="commit", limit=10) == events
+
+        [old] = build_event_records(push_payload(9, "ancient"), "push")
+        old["created_at"] = int(time.time()) - 2 * 86400
+        await history._run(history._insert, [old])
+        await history._run(history._apply_retention)
+        assert await history.query(text="ancient") == []
+        await history.close()
+
+    asyncio.run(run())
+
+
+def test_close_flushes_buffer(tmp_path):
+    """测试关闭时写入缓冲区中的记录"""
+
+    async def run():
+        history = EventHistory(tmp_path / "events.db", batch_size=100)
+        history.record(push_payload(1, "pending write"), "push")
+        await history.close()
+
+        reopened = EventHistory(tmp_path / "events.db")
+        assert len(await reopened.query(text="pending")) == 1
+        await reopened.close()
+
+    asyncio.run(run())
+
+
+def test_format_history_results():
+    """测试查询结果格式"""
+    records = build_event_records(pr_payload(10, "Add cache"), "pull_request")
+    message = format_history_results(records)
+    assert "PR #10 opened: Add cache" in message
+    assert "https://github.com/owner/repo/pull/10" in message
+    assert format_history_results([]) == "🔍 没有找到匹配的事件"
@@ -0,0 +1,130 @@
+"""Tests for keyed ordered dispatcher."""
+
+import asyncio
+import time
+
+from src.utils.ordered_dispatcher import KeyedDispatcher
+
+
+def test_order_kept_within_key():
+    """测试同一 key 内按提交顺序执行，即使前面的任务更慢"""
+
+    async def run():
+        dispatcher = KeyedDispatcher()
+        delivered = []
+
+        async def deliver(name, delay):
+            await asyncio.sleep(delay)
+            delivered.append(name)
+
+        await asyncio.gather(
+            dispatcher.submit("owner/repo#1", deliver, "opened", 0.05),
+            dispatcher.submit("owner/repo#1", deliver, "closed", 0),
+        )
+        assert delivered == ["opened", "closed"]
+
+    asyncio.run(run())
+
+
+def test_parallel_across_keys():
+    """测试不同 key 之间并行执行"""
+
+    async def run():
+        dispatcher = KeyedDispatcher()
+
+        async def deliver():
+            await asyncio.sleep(0.1)
+
+        started = time.monotonic()
+        await asyncio.gather(
+            *(dispatcher.submit(f"owner/repo-{i}", deliver) for i in range(10))
+        )
+        assert time.monotonic() - started < 0.5
+
+    asyncio.run(run())
+
+
+def test_idle_lanes_reclaimed():
+    """测试任务完成后 lane 被回收"""
+
+    async def run():
+        dispatcher = KeyedDispatcher()
+
+        async def deliver():
+            await asyncio.sleep(0)
+
+        for i in range(100):
+            await dispatcher.submit(f"owner/repo-{i}", deliver)
+        assert dispatcher.get_lane_count() == 0
+
+    asyncio.run(run())
+
+
+def test_failed_job_does_not_block_lane():
+    """测试前一个任务失败不影响后续任务"""
+
+    async def run():
+        dispatcher = KeyedDispatcher()
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def succeed():
+            return "ok"
+
+        results = await asyncio.gather(
+            dispatcher.submit("owner/repo", fail),
+            dispatcher.submit("owner/repo", succeed),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], RuntimeError)
+        assert results[1] == "ok"
+        assert dispatcher.get_lane_count() == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_caller_keeps_order():
+    """测试调用方被取消时任务仍会执行，后续任务顺序不变"""
+
+    async def run():
+        dispatcher = KeyedDispatcher()
+        delivered = []
+
+        async def deliver(name, delay):
+            await asyncio.sleep(delay)
+            delivered.append(name)
+
+        first = asyncio.ensure_future(
+            dispatcher.submit("owner/repo", deliver, "first", 0.05)
+        )
+        await asyncio.sleep(0)
+        first.cancel()
+        await dispatcher.submit("owner/repo", deliver, "second", 0)
+        assert delivered == ["first", "second"]
+
+    asyncio.run(run())
+
+
+def test_enqueue_returns_before_lane_backlog():
+    """测试 enqueue 不等待同一 key 之前的任务，drain 等待全部完成"""
+
+    async def run():
+        dispatcher = KeyedDispatcher()
+        delivered = []
+
+        async def deliver(name, delay):
+            await asyncio.sleep(delay)
+            delivered.append(name)
+
+        started = time.monotonic()
+        dispatcher.enqueue("owner/repo", deliver, "slow", 0.2)
+        dispatcher.enqueue("owner/repo", deliver, "next", 0)
+        assert time.monotonic() - started < 0.05
+        assert delivered == []
+
+        await dispatcher.drain()
+        assert delivered == ["slow", "next"]
+        assert dispatcher.get_lane_count() == 0
+
+    asyncio.run(run())
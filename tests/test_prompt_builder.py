@@ -0,0 +1,163 @@
+"""Tests for LLM prompt builder."""
+
+from src.formatters.push_formatter import format_push_message
+from src.services.prompt_builder import (
+    INSTRUCTION_BLOCK,
+    PERSONA_INSTRUCTION_BLOCK,
+    TokenStats,
+    build_prompt,
+    compact_message,
+)
+from src.utils.token_estimator import estimate_tokens, truncate_to_tokens
+
+URL = "https://github.com/owner/repo/commit/abc1234"
+
+
+def make_push_message(commit_message: str) -> str:
+    return format_push_message(
+        author_name="username",
+        repo_name="owner/repo",
+        branch="main",
+        commit_message=commit_message,
+        commit_url=URL,
+        commit_id="abc1234",
+    )
+
+
+def test_estimate_tokens():
+    """测试 token 估算：ASCII 约 4 字符 1 token，中文每字 1 token"""
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd" * 10) == 10
+    assert estimate_tokens("修复问题") == 4
+
+
+def test_truncate_to_tokens():
+    """测试按 token 截断"""
+    text = "word " * 100
+    truncated = truncate_to_tokens(text, 20)
+    assert truncated.endswith("…")
+    assert estimate_tokens(truncated) <= 20
+    assert truncate_to_tokens("short", 20) == "short"
+
+
+def test_build_prompt_unchanged_within_budget():
+    """测试预算充足时提示词保持原样"""
+    message = make_push_message("Fix bug")
+    prompt, input_tokens = build_prompt(message, "", 1024)
+    assert prompt == f"GitHub 事件信息：\n\n{message}\n\n{INSTRUCTION_BLOCK}"
+    assert input_tokens == estimate_tokens(prompt)
+
+
+def test_build_prompt_counts_system_prompt():
+    """测试输入 token 数包含系统提示词"""
+    message = make_push_message("Fix bug")
+    prompt, input_tokens = build_prompt(message, "你是一个技术博客编辑", 1024)
+    assert input_tokens == estimate_tokens(prompt) + estimate_tokens(
+        "你是一个技术博客编辑"
+    )
+
+
+def test_build_prompt_persona_instructions():
+    """测试配置人设时指令块不再包含语气和风格要求"""
+    message = make_push_message("Fix bug")
+    prompt, _ = build_prompt(message, "你是一个技术博客编辑", 1024)
+    assert prompt.endswith(PERSONA_INSTRUCTION_BLOCK)
+    assert "emoji" not in prompt
+    prompt, _ = build_prompt(message, "", 1024)
+    assert prompt.endswith(INSTRUCTION_BLOCK)
+
+
+def test_compact_keeps_urls_and_identifiers():
+    """测试压缩后保留 URL 和 commit SHA，并省略 commit 正文"""
+    body = "\n".join(f"detail line {i} " * 5 for i in range(50))
+    message = make_push_message(f"{'Very long subject ' * 30}\n\n{body}")
+    compacted = compact_message(message, 100)
+
+    assert estimate_tokens(compacted) <= 100
+    assert URL in compacted
+    assert "abc1234" in compacted
+    assert "📦 GitHub Push Event" in compacted
+    assert "省略" in compacted
+    assert "detail line" not in compacted
+
+
+def test_compact_keeps_body_lines_with_links():
+    """测试 commit 正文中含 URL 或 #编号 的行不被省略，其余正文逐行省略"""
+    issue_line = "See https://github.com/o/r/issues/42 and #43"
+    body = "\n".join(f"detail line {i} " * 5 for i in range(20))
+    message = make_push_message(f"Fix rate limiter\n\n{issue_line}\n{body}")
+    compacted = compact_message(message, 150)
+
+    assert estimate_tokens(compacted) <= 150
+    assert issue_line in compacted
+    assert URL in compacted
+    # 从正文末尾开始省略，预算允许时保留靠前的正文行
+    assert "detail line 0" in compacted
+    assert "detail line 19" not in compacted
+
+
+def test_compact_cjk_body_within_budget():
+    """测试中文 commit 正文也会被省略，结果不超出预算"""
+    body = "\n".join(
+        f"第{i}行：调整令牌桶的补充速率并修正边界条件的计算错误" for i in range(40)
+    )
+    message = make_push_message(f"修复限流器溢出问题\n\n{body}")
+    compacted = compact_message(message, 150)
+
+    assert estimate_tokens(compacted) <= 150
+    assert "💬 修复限流器溢出问题" in compacted
+    assert "省略" in compacted
+    assert URL in compacted
+
+
+def test_compact_hex_heavy_body_within_budget():
+    """测试含大量 commit SHA 和 #编号 的正文（依赖升级）也会被省略"""
+    body = "\n".join(
+        f"Bumps pkg{i} from {i:07x}a to {i + 1:07x}b, see #{i}" for i in range(40)
+    )
+    message = make_push_message(f"Bump dependencies\n\n{body}")
+    compacted = compact_message(message, 150)
+
+    assert estimate_tokens(compacted) <= 150
+    assert "省略" in compacted
+    assert "abc1234" in compacted
+    assert URL in compacted
+
+
+def test_compact_replaces_body_when_links_exceed_budget():
+    """测试含 URL 的正文行本身超出预算时，整段正文替换为省略标记"""
+    body = "\n".join(f"See https://github.com/o/r/issues/{i}" for i in range(40))
+    message = make_push_message(f"Fix rate limiter\n\n{body}")
+    compacted = compact_message(message, 100)
+
+    assert estimate_tokens(compacted) <= 100
+    assert "issues/" not in compacted
+    assert "省略 40 行" in compacted
+    assert URL in compacted
+
+
+def test_build_prompt_respects_budget():
+    """测试超长消息被压缩到预算内"""
+    message = make_push_message("Very long commit message " * 200)
+    prompt, _ = build_prompt(message, "", 256)
+    assert estimate_tokens(prompt) <= 256
+    assert URL in prompt
+
+
+def test_build_prompt_unlimited_budget():
+    """测试预算为 0 时不压缩"""
+    message = make_push_message("Very long commit message " * 200)
+    prompt, _ = build_prompt(message, "", 0)
+    assert message in prompt
+
+
+def test_token_stats():
+    """测试按事件类型累计 token 用量"""
+    stats = TokenStats()
+    stats.record("push", 100, 20)
+    stats.record("push", 50, 10)
+    stats.record("issues", 30, 5)
+    assert stats.get_usage() == {
+        "push": {"calls": 2, "input_tokens": 150, "output_tokens": 30},
+        "issues": {"calls": 1, "input_tokens": 30, "output_tokens": 5},
+    }
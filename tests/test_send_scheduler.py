@@ -0,0 +1,144 @@
+"""Tests for outbound send scheduler."""
+
+import asyncio
+
+from src.utils.send_scheduler import (
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    OutboundScheduler,
+    TokenBucket,
+)
+
+TARGET = "test:GroupMessage:123456"
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, target, message):
+        self.sent.append((target, message))
+
+
+def test_token_bucket():
+    """测试令牌桶的突发容量和补充速率"""
+    bucket = TokenBucket(rate=1, capacity=2)
+    now = bucket.updated
+    assert bucket.try_acquire(now) == 0
+    assert bucket.try_acquire(now) == 0
+    assert bucket.try_acquire(now) > 0
+    assert bucket.try_acquire(now + 1) == 0
+
+
+def test_sends_immediately_within_burst():
+    """测试未超出突发容量时直接发送"""
+
+    async def run():
+        recorder = Recorder()
+        scheduler = OutboundScheduler(recorder.send, rate_per_minute=60, burst=3)
+        for i in range(3):
+            await scheduler.enqueue(TARGET, f"msg {i}")
+        assert [m for _, m in recorder.sent] == ["msg 0", "msg 1", "msg 2"]
+        assert scheduler.get_backlog(TARGET) == 0
+
+    asyncio.run(run())
+
+
+def test_high_priority_jumps_queue():
+    """测试积压时高优先级消息先发送"""
+
+    async def run():
+        recorder = Recorder()
+        scheduler = OutboundScheduler(recorder.send, rate_per_minute=1200, burst=1)
+        await scheduler.enqueue(TARGET, "first", PRIORITY_NORMAL)
+        await scheduler.enqueue(TARGET, "normal", PRIORITY_NORMAL)
+        await scheduler.enqueue(TARGET, "ci failed", PRIORITY_HIGH)
+        assert scheduler.get_backlog(TARGET) == 2
+
+        await asyncio.sleep(0.3)
+        assert [m for _, m in recorder.sent] == ["first", "ci failed", "normal"]
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_priority_does_not_reorder_same_key():
+    """测试同一 key 的消息不会被高优先级消息越过，其他 key 仍可插队"""
+
+    async def run():
+        recorder = Recorder()
+        scheduler = OutboundScheduler(recorder.send, rate_per_minute=1200, burst=1)
+        await scheduler.enqueue(TARGET, "first", PRIORITY_NORMAL, "owner/a")
+        await scheduler.enqueue(TARGET, "pr opened", PRIORITY_NORMAL, "owner/repo#1")
+        await scheduler.enqueue(TARGET, "other", PRIORITY_NORMAL, "owner/b")
+        await scheduler.enqueue(TARGET, "pr security", PRIORITY_HIGH, "owner/repo#1")
+        await scheduler.enqueue(TARGET, "ci failed", PRIORITY_HIGH, "owner/c")
+
+        await asyncio.sleep(0.3)
+        assert [m for _, m in recorder.sent] == [
+            "first",
+            "ci failed",
+            "pr opened",
+            "pr security",
+            "other",
+        ]
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_low_priority_backlog_merged():
+    """测试积压的低优先级消息合并为一条，而不是丢弃"""
+
+    async def run():
+        recorder = Recorder()
+        scheduler = OutboundScheduler(recorder.send, rate_per_minute=1200, burst=1)
+        await scheduler.enqueue(TARGET, "first", PRIORITY_NORMAL)
+        for i in range(5):
+            await scheduler.enqueue(TARGET, f"push {i}", PRIORITY_LOW)
+
+        await asyncio.sleep(0.3)
+        messages = [m for _, m in recorder.sent]
+        assert len(messages) == 2
+        assert messages[1].startswith("📚 5 条通知合并发送")
+        for i in range(5):
+            assert f"push {i}" in messages[1]
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_targets_paced_independently():
+    """测试不同目标的速率互不影响"""
+
+    async def run():
+        recorder = Recorder()
+        scheduler = OutboundScheduler(recorder.send, rate_per_minute=1, burst=1)
+        await scheduler.enqueue("a", "to a")
+        await scheduler.enqueue("b", "to b")
+        await scheduler.enqueue("a", "to a again")
+        assert recorder.sent == [("a", "to a"), ("b", "to b")]
+        assert scheduler.get_backlog("a") == 1
+        await scheduler.close()
+
+    asyncio.run(run())
+
+
+def test_close_discards_backlog():
+    """测试关闭后积压的消息被丢弃，重新使用时不会再发送"""
+
+    async def run():
+        recorder = Recorder()
+        scheduler = OutboundScheduler(recorder.send, rate_per_minute=1, burst=1)
+        await scheduler.enqueue(TARGET, "sent")
+        await scheduler.enqueue(TARGET, "dropped")
+        await scheduler.close()
+        assert scheduler.get_backlog(TARGET) == 0
+
+        await scheduler.enqueue(TARGET, "after restart")
+        await asyncio.sleep(0.1)
+        assert [m for _, m in recorder.sent] == ["sent", "after restart"]
+        await scheduler.close()
+
+    asyncio.run(run())
@@ -0,0 +1,297 @@
+"""Soak tests for GitHub Webhook plugin.
+
+长时间压力测试：持续向 handle_webhook 投递已签名的合成事件，检测内存增长和
+事件循环卡顿，并反复启停服务器以检测泄漏的 socket 和 task。
+
+默认跳过，设置环境变量后运行：
+
+    GITHUB_WEBHOOK_SOAK_EVENTS=200000 pytest tests/test_soak.py -v
+"""
+
+import asyncio
+import gc
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import tracemalloc
+
+import pytest
+from aiohttp import ClientSession
+from astrbot.api import AstrBotConfig
+from src.core.plugin import GitHubWebhookPlugin
+
+SOAK_EVENTS = int(os.environ.get("GITHUB_WEBHOOK_SOAK_EVENTS", "0"))
+SOAK_SERVER_CYCLES = int(os.environ.get("GITHUB_WEBHOOK_SOAK_SERVER_CYCLES", "50"))
+
+# 预热之后允许的 Python 堆增长上限（tracemalloc 统计）
+MAX_TRACED_GROWTH = 8 * 1024 * 1024
+# 预热之后允许的 RSS 增长上限
+MAX_RSS_GROWTH = 64 * 1024 * 1024
+# 允许的最大事件循环延迟（秒）
+MAX_LOOP_LAG = 0.5
+# 采样次数
+SAMPLES = 10
+
+SECRET = "soak_secret"
+
+pytestmark = pytest.mark.skipif(
+    SOAK_EVENTS <= 0, reason="set GITHUB_WEBHOOK_SOAK_EVENTS to run soak tests"
+)
+
+
+class FakeContext:
+    """只记录发送次数的假 Context"""
+
+    def __init__(self):
+        self.sent = 0
+
+    async def send_message(self, umo, message_chain):
+        self.sent += 1
+        return True
+
+
+class FakeRequest:
+    """handle_webhook 只用到 headers 和 read()"""
+
+    def __init__(self, event_type: str, body: bytes, signature: str):
+        self.headers = {
+            "X-GitHub-Event": event_type,
+            "X-Hub-Signature-256": signature,
+        }
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+def make_config(**overrides) -> AstrBotConfig:
+    config_data = {
+        "port": 0,
+        "target_umo": "test:GroupMessage:123456",
+        "webhook_secret": SECRET,
+        "rate_limit": 0,
+        # 不限制发送速率，统计送达数量时无需等待排队
+        "send_rate_limit": 0,
+        "enable_agent": False,
+        "llm_provider_id": "",
+        "agent_timeout": 60,
+        "agent_system_prompt": "",
+    }
+    config_data.update(overrides)
+    return AstrBotConfig(config_data)
+
+
+def make_payload(event_type: str, i: int) -> dict:
+    """构造第 i 个合成事件，仓库名和编号不断变化以覆盖缓存键"""
+    repository = {"full_name": f"soak/repo-{i % 1000}"}
+    sender = {"login": f"user-{i % 97}"}
+    if event_type == "push":
+        return {
+            "ref": "refs/heads/main",
+            "pusher": {"name": sender["login"], "email": ""},
+            "repository": repository,
+            "commits": [
+                {
+                    "id": hashlib.sha1(str(i).encode()).hexdigest(),
+                    "message": f"Commit #{i}",
+                    "url": f"https://github.com/soak/repo/commit/{i}",
+                }
+            ],
+        }
+    if event_type == "issues":
+        return {
+            "action": "opened",
+            "issue": {
+                "number": i,
+                "title": f"Issue #{i}",
+                "html_url": f"https://github.com/soak/repo/issues/{i}",
+            },
+            "repository": repository,
+            "sender": sender,
+        }
+    return {
+        "action": "opened",
+        "pull_request": {
+            "number": i,
+            "title": f"PR #{i}",
+            "html_url": f"https://github.com/soak/repo/pull/{i}",
+            "base": {"ref": "main"},
+            "head": {"ref": f"feature-{i}"},
+        },
+        "repository": repository,
+        "sender": sender,
+    }
+
+
+def make_request(i: int) -> FakeRequest:
+    event_type = ("push", "issues", "pull_request", "ping")[i % 4]
+    body = json.dumps(make_payload(event_type, i)).encode("utf-8")
+    digest = hmac.new(SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return FakeRequest(event_type, body, f"sha256={digest}")
+
+
+def rss_bytes() -> int:
+    """当前进程 RSS；无 /proc 时退化为峰值 RSS"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def open_fd_count() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+
+class LoopLagMonitor:
+    """周期性 sleep，记录实际唤醒时间相对预期的最大延迟"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, loop.time() - expected)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+async def _drive(plugin: GitHubWebhookPlugin, start: int, count: int):
+    for i in range(start, start + count):
+        response = await plugin.handle_webhook(make_request(i))
+        assert response.status in (200, 429)
+        # 让出事件循环，使 lag 监控可以被调度
+        if i % 64 == 0:
+            await asyncio.sleep(0)
+    # handle_webhook 入队后即返回，等待投递完成再采样
+    await plugin.dispatcher.drain()
+
+
+async def _soak_handle_webhook(rate_limit: int):
+    # 每个事件都会写日志，pytest 的日志捕获会无限累积记录，压测期间关闭日志
+    logging.disable(logging.CRITICAL)
+    try:
+        await _soak_handle_webhook_inner(rate_limit)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+async def _soak_handle_webhook_inner(rate_limit: int):
+    context = FakeContext()
+    plugin = GitHubWebhookPlugin(context, make_config(rate_limit=rate_limit))
+    monitor = LoopLagMonitor()
+    monitor.start()
+
+    # 预热：让缓存、惰性导入等一次性分配完成
+    warmup = min(SOAK_EVENTS // SAMPLES, 10000)
+    await _drive(plugin, 0, warmup)
+
+    gc.collect()
+    tracemalloc.start()
+    baseline_snapshot = tracemalloc.take_snapshot()
+    baseline_traced = tracemalloc.get_traced_memory()[0]
+    baseline_rss = rss_bytes()
+
+    chunk = max((SOAK_EVENTS - warmup) // SAMPLES, 1)
+    traced_samples = []
+    try:
+        for n in range(SAMPLES):
+            await _drive(plugin, warmup + n * chunk, chunk)
+            gc.collect()
+            traced_samples.append(tracemalloc.get_traced_memory()[0] - baseline_traced)
+        final_snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        await monitor.stop()
+
+    rss_growth = rss_bytes() - baseline_rss
+    top = final_snapshot.compare_to(baseline_snapshot, "lineno")[:5]
+    detail = "\n".join(str(stat) for stat in top)
+
+    assert traced_samples[-1] < MAX_TRACED_GROWTH, (
+        f"Python heap grew by {traced_samples[-1]} bytes, samples={traced_samples}\n"
+        f"{detail}"
+    )
+    assert rss_growth < MAX_RSS_GROWTH, f"RSS grew by {rss_growth} bytes"
+    assert monitor.max_lag < MAX_LOOP_LAG, (
+        f"Event loop stalled for {monitor.max_lag:.3f}s"
+    )
+
+    if plugin.rate_limiter:
+        assert len(plugin.rate_limiter.requests) <= plugin.rate_limiter.max_requests
+    else:
+        # ping 事件不发送消息，其余 3/4 事件都应送达
+        total = warmup + chunk * SAMPLES
+        assert context.sent == sum(1 for i in range(total) if i % 4 != 3)
+
+
+def test_soak_handle_webhook_without_rate_limit():
+    """测试持续投递下内存不增长、事件循环不卡顿"""
+    asyncio.run(_soak_handle_webhook(rate_limit=0))
+
+
+def test_soak_handle_webhook_with_rate_limit():
+    """测试限流器在持续超限的请求下保持有界"""
+    asyncio.run(_soak_handle_webhook(rate_limit=60))
+
+
+async def _cycle_server():
+    plugin = GitHubWebhookPlugin(FakeContext(), make_config())
+
+    # 先完整启停一次，排除首次启动的一次性分配
+    await plugin.start_server()
+    await plugin.terminate()
+    gc.collect()
+    baseline_fds = open_fd_count()
+    baseline_tasks = len(asyncio.all_tasks())
+
+    started = time.monotonic()
+    async with ClientSession() as session:
+        for _ in range(SOAK_SERVER_CYCLES):
+            await plugin.start_server()
+            port = plugin.runner.addresses[0][1]
+            async with session.post(
+                f"http://127.0.0.1:{port}/webhook",
+                headers={"X-GitHub-Event": "ping"},
+                data=b"{}",
+            ) as resp:
+                assert resp.status == 200
+            # 重复调用 start_server 应清理上一个实例
+            await plugin.start_server()
+            await plugin.terminate()
+            assert plugin.site is None
+            assert plugin.runner is None
+
+    gc.collect()
+    await asyncio.sleep(0)
+    assert open_fd_count() - baseline_fds <= 0, (
+        f"Leaked {open_fd_count() - baseline_fds} file descriptors "
+        f"after {SOAK_SERVER_CYCLES} cycles in {time.monotonic() - started:.1f}s"
+    )
+    assert len(asyncio.all_tasks()) <= baseline_tasks, "Leaked asyncio tasks"
+
+
+@pytest.mark.skipif(
+    not os.path.isdir("/proc/self/fd"), reason="requires /proc to count open fds"
+)
+def test_soak_server_start_terminate_cycles():
+    """测试反复启停服务器不泄漏 socket 和 task"""
+    asyncio.run(_cycle_server())